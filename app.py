@@ -4,9 +4,13 @@ Universal LangGraph Framework - Main Application.
 This is the entry point for running the universal assistant framework.
 """
 
+import asyncio
+import io
+import sys
+
 from langchain_core.messages import HumanMessage
 from configuration import get_finance_config, get_todo_config
-from graph import create_graph
+from graph import create_graph, open_persistent_graph
 
 
 # Create graph with persistence for standalone use
@@ -48,23 +52,42 @@ def run_finance_assistant():
         "What's your advice on my finances so far?"
     ]
     
-    for user_message in test_messages:
-        print(f"You: {user_message}")
-        print()
+    asyncio.run(_run_conversation(test_messages, config))
+
+
+async def _run_conversation(messages: list[str], config: dict):
+    """
+    Play a scripted conversation through the graph on one event loop.
+    
+    The turns share a thread and the user's memory store (the summary
+    and advice turns read what earlier turns recorded), so they are
+    awaited in order rather than batched.
+    
+    Args:
+        messages: User messages to send, in order
+        config: Graph configuration including thread_id
+    """
+    
+    for user_message in messages:
+        print(f"You: {user_message}\n", flush=True)
         
-        # Invoke the graph
-        result = graph.invoke(
+        # Invoke the graph (async API - some nodes are coroutines)
+        result = await graph.ainvoke(
             {"messages": [HumanMessage(content=user_message)]},
             config=config
         )
         
+        # Buffer the rest of the turn and write it in one call
+        buf = io.StringIO()
+        
         # Get the last assistant message
         last_message = result["messages"][-1]
         if hasattr(last_message, 'content'):
-            print(f"Assistant: {last_message.content}")
-        print()
-        print("-" * 60)
-        print()
+            buf.write(f"Assistant: {last_message.content}\n")
+        buf.write("\n" + "-" * 60 + "\n\n")
+        
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
 
 
 def run_interactive_session(assistant_type="finance"):
@@ -93,39 +116,66 @@ def run_interactive_session(assistant_type="finance"):
     print("=" * 60)
     print()
     
-    while True:
-        try:
-            # Get user input
-            user_input = input("You: ").strip()
-            
-            if not user_input:
-                continue
-            
-            if user_input.lower() in ['exit', 'quit', 'bye']:
-                print("Goodbye!")
+    asyncio.run(_interactive_loop(config))
+
+
+async def _interactive_loop(config: dict):
+    """
+    Read user input and stream replies until the user exits.
+    
+    The session keeps one event loop open for its SQLite-backed graph,
+    so conversation history and memories persist across restarts.
+    
+    Args:
+        config: Graph configuration including thread_id
+    """
+    
+    async with open_persistent_graph() as session_graph:
+        while True:
+            try:
+                # Read input off the loop so it isn't blocked while waiting
+                user_input = (await asyncio.to_thread(input, "You: ")).strip()
+                
+                if not user_input:
+                    continue
+                
+                if user_input.lower() in ['exit', 'quit', 'bye']:
+                    print("Goodbye!")
+                    break
+                
+                print()
+                
+                # Stream the turn so the reply prints as soon as it's produced
+                await _stream_turn(session_graph, user_input, config)
+                
+                print()
+                
+            except KeyboardInterrupt:
+                print("\nGoodbye!")
                 break
-            
-            print()
-            
-            # Invoke the graph
-            result = graph.invoke(
-                {"messages": [HumanMessage(content=user_input)]},
-                config=config
-            )
-            
-            # Get the last assistant message
-            last_message = result["messages"][-1]
-            if hasattr(last_message, 'content'):
-                print(f"Assistant: {last_message.content}")
-            
-            print()
-            
-        except KeyboardInterrupt:
-            print("\nGoodbye!")
-            break
-        except Exception as e:
-            print(f"Error: {e}")
-            print()
+            except Exception as e:
+                print(f"Error: {e}")
+                print()
+
+
+async def _stream_turn(session_graph, user_input: str, config: dict):
+    """
+    Run one interactive turn and print the assistant's reply as it arrives.
+    
+    main_assistant writes the reply's text deltas to the custom stream;
+    the routing pass and executor tool messages are internal.
+    """
+    
+    print("Assistant: ", end="", flush=True)
+    
+    async for event in session_graph.astream(
+        {"messages": [HumanMessage(content=user_input)]},
+        config=config,
+        stream_mode="custom"
+    ):
+        print(event["delta"], end="", flush=True)
+    
+    print()
 
 
 def main():
@@ -6,11 +6,12 @@ configurations for different assistant types (finance, todo, etc.).
 """
 
 from typing import Literal, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
 from langchain_core.runnables import RunnableConfig
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Configuration:
     """
     Universal configuration schema for assistant behavior.
@@ -52,6 +53,18 @@ class Configuration:
         metadata={"description": "List of available intent options for the router"}
     )
     
+    # How far back executors scan the conversation for earlier context
+    history_lookback: int = field(
+        default=20,
+        metadata={"description": "Number of recent messages executors search for previous parameters"}
+    )
+    
+    # Upper bound on stored memories shown to the extractor per memory type
+    max_existing_memories: int = field(
+        default=50,
+        metadata={"description": "Maximum existing memories per type passed to Trustcall for updates"}
+    )
+    
     # Optional category/namespace for multi-tenancy
     category: str = field(
         default="default",
@@ -63,6 +76,10 @@ class Configuration:
         """
         Create Configuration from RunnableConfig.
         
+        Every node parses the same configurable dict on each step, so
+        parsed instances are memoized on the relevant configurable items.
+        The returned instance is shared and must be treated as read-only.
+        
         Args:
             config: LangGraph RunnableConfig object
             
@@ -73,13 +90,94 @@ class Configuration:
             return cls()
         
         configurable = config["configurable"]
-        return cls(**{k: v for k, v in configurable.items() if k in cls.__annotations__})
+        items = tuple(
+            (k, tuple(v) if isinstance(v, list) else v)
+            for k, v in configurable.items() if k in _FIELDS
+        )
+        try:
+            return _configuration_from_items(cls, items)
+        except TypeError:
+            # Unhashable value - parse without caching
+            return cls(**{k: v for k, v in configurable.items() if k in _FIELDS})
+
+
+# Field names accepted from the configurable dict
+_FIELDS = frozenset(f.name for f in fields(Configuration))
+
+
+@lru_cache(maxsize=256)
+def _configuration_from_items(cls: type, items: tuple) -> Configuration:
+    """Build a Configuration from hashable (name, value) pairs."""
+    return cls(**{k: list(v) if isinstance(v, tuple) else v for k, v in items})
 
 
 # ============================================================================
 # Predefined Configurations
 # ============================================================================
 
+# Templates are built once at import; the getters only copy the top-level
+# dict and set user_id. Nested lists and strings are shared - do not mutate.
+_FINANCE_TEMPLATE = {
+    "assistant_type": "finance",
+    "category": "personal_finance",
+    "role_prompt": """You are a Personal Finance Assistant. Your role is to help users:
+
+- Track income and expenses
+- Set and monitor budgets
+- Create financial goals
+- Manage recurring payments
+- Provide financial advice and insights
+- Generate spending summaries
+
+You are knowledgeable, helpful, and focused on helping users achieve financial wellness.""",
+    "enabled_memory_types": [
+        "profile",
+        "finance_transactions",
+        "finance_budgets",
+        "finance_goals",
+        "finance_recurring_payments",
+        "finance_debt_plans"
+    ],
+    "router_intents": [
+        "add_transaction",
+        "update_transaction",
+        "monthly_summary",
+        "set_budget",
+        "create_goal",
+        "add_recurring_payment",
+        "debt_payoff_plan",
+        "advice",
+        "other"
+    ]
+}
+
+_TODO_TEMPLATE = {
+    "assistant_type": "todo",
+    "category": "tasks",
+    "role_prompt": """You are a Task Management Assistant. Your role is to help users:
+
+- Create and manage tasks
+- Track task status
+- Set deadlines and priorities
+- Suggest solutions for completing tasks
+- Organize tasks efficiently
+
+You are organized, proactive, and focused on helping users be productive.""",
+    "enabled_memory_types": [
+        "profile",
+        "todo_tasks",
+        "todo_instructions"
+    ],
+    "router_intents": [
+        "add_task",
+        "update_task",
+        "task_summary",
+        "update_preferences",
+        "other"
+    ]
+}
+
+
 def get_finance_config(user_id: str = "default_user") -> dict:
     """
     Get configuration for Personal Finance Assistant.
@@ -90,42 +188,7 @@ def get_finance_config(user_id: str = "default_user") -> dict:
     Returns:
         Configuration dictionary
     """
-    return {
-        "configurable": {
-            "user_id": user_id,
-            "assistant_type": "finance",
-            "category": "personal_finance",
-            "role_prompt": """You are a Personal Finance Assistant. Your role is to help users:
-
-- Track income and expenses
-- Set and monitor budgets
-- Create financial goals
-- Manage recurring payments
-- Provide financial advice and insights
-- Generate spending summaries
-
-You are knowledgeable, helpful, and focused on helping users achieve financial wellness.""",
-            "enabled_memory_types": [
-                "profile",
-                "finance_transactions",
-                "finance_budgets",
-                "finance_goals",
-                "finance_recurring_payments",
-                "finance_debt_plans"
-            ],
-            "router_intents": [
-                "add_transaction",
-                "update_transaction",
-                "monthly_summary",
-                "set_budget",
-                "create_goal",
-                "add_recurring_payment",
-                "debt_payoff_plan",
-                "advice",
-                "other"
-            ]
-        }
-    }
+    return {"configurable": {"user_id": user_id, **_FINANCE_TEMPLATE}}
 
 
 def get_todo_config(user_id: str = "default_user") -> dict:
@@ -138,31 +201,4 @@ def get_todo_config(user_id: str = "default_user") -> dict:
     Returns:
         Configuration dictionary
     """
-    return {
-        "configurable": {
-            "user_id": user_id,
-            "assistant_type": "todo",
-            "category": "tasks",
-            "role_prompt": """You are a Task Management Assistant. Your role is to help users:
-
-- Create and manage tasks
-- Track task status
-- Set deadlines and priorities
-- Suggest solutions for completing tasks
-- Organize tasks efficiently
-
-You are organized, proactive, and focused on helping users be productive.""",
-            "enabled_memory_types": [
-                "profile",
-                "todo_tasks",
-                "todo_instructions"
-            ],
-            "router_intents": [
-                "add_task",
-                "update_task",
-                "task_summary",
-                "update_preferences",
-                "other"
-            ]
-        }
-    }
\ No newline at end of file
+    return {"configurable": {"user_id": user_id, **_TODO_TEMPLATE}}
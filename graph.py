@@ -8,6 +8,9 @@ Graph Flow:
 START → main_assistant → router → executor → memory_update → main_assistant → END
 """
 
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import Literal
 
 from langgraph.graph import StateGraph, MessagesState, START, END
@@ -16,18 +19,35 @@ from configuration import Configuration
 from nodes.main_assistant import main_assistant
 from nodes.router import router, route_to_executor
 from nodes.memory_update import memory_update
+from utils.intent_registry import INTENT_REGISTRY
 
-# Import all executor nodes
-from nodes.executors.finance_add_transaction import finance_add_transaction_executor
-from nodes.executors.finance_summary import finance_summary_executor
-from nodes.executors.finance_budget import finance_budget_executor
-from nodes.executors.finance_goal import finance_goal_executor
-from nodes.executors.finance_recurring import finance_recurring_executor
-from nodes.executors.finance_advice import finance_advice_executor
-from nodes.executors.finance_debt_payoff import finance_debt_payoff_executor
 
+# Termination condition - END after main_assistant gives final response
+def should_continue(state: MessagesState) -> Literal["router", END]:
+    """Determine if conversation should continue or end."""
+    last_message = state["messages"][-1]
+    
+    # main_assistant records its routing decision on the message
+    route = getattr(last_message, "additional_kwargs", {}).get("_route")
+    if route is not None:
+        return route
+    
+    # Fallback for messages not produced by main_assistant (e.g. edited state).
+    # Most such messages are final responses, so check for tool calls first.
+    tool_calls = getattr(last_message, "tool_calls", None)
+    if not tool_calls:
+        return END
+    
+    # Check for RouteIntent tool calls (lists are tiny; a plain loop beats any())
+    for tc in tool_calls:
+        if tc.get("name") == "RouteIntent":
+            return "router"
+    
+    # Other tool calls = final response, end conversation
+    return END
 
-def create_graph(with_persistence=False):
+
+def create_graph(with_persistence=False, checkpointer=None, store=None):
     """
     Create and compile the universal LangGraph.
     
@@ -37,11 +57,24 @@ def create_graph(with_persistence=False):
     Args:
         with_persistence: If True, adds MemorySaver and InMemoryStore.
                          Set to False for LangGraph Studio (default).
+        checkpointer: Checkpointer to compile with (overrides MemorySaver)
+        store: Store to compile with (overrides InMemoryStore)
     
     Returns:
         Compiled graph ready for execution
     """
     
+    # Executors are imported here so loading this module stays cheap
+    from nodes.executors import (
+        finance_add_transaction_executor,
+        finance_summary_executor,
+        finance_budget_executor,
+        finance_goal_executor,
+        finance_recurring_executor,
+        finance_advice_executor,
+        finance_debt_payoff_executor,
+    )
+    
     # Initialize the state graph with configuration schema
     builder = StateGraph(
         MessagesState,
@@ -61,16 +94,21 @@ def create_graph(with_persistence=False):
     # ========================================================================
     
     # Finance executors
-    builder.add_node("finance_add_transaction_executor", finance_add_transaction_executor)
-    builder.add_node("finance_summary_executor", finance_summary_executor)
-    builder.add_node("finance_budget_executor", finance_budget_executor)
-    builder.add_node("finance_goal_executor", finance_goal_executor)
-    builder.add_node("finance_recurring_executor", finance_recurring_executor)
-    builder.add_node("finance_advice_executor", finance_advice_executor)
-    builder.add_node("finance_debt_payoff_executor", finance_debt_payoff_executor)
+    executor_nodes = {
+        "finance_add_transaction_executor": finance_add_transaction_executor,
+        "finance_summary_executor": finance_summary_executor,
+        "finance_budget_executor": finance_budget_executor,
+        "finance_goal_executor": finance_goal_executor,
+        "finance_recurring_executor": finance_recurring_executor,
+        "finance_advice_executor": finance_advice_executor,
+        "finance_debt_payoff_executor": finance_debt_payoff_executor,
+    }
     
     # TODO: Add more executor nodes for other domains (todo, legal, study, etc.)
     
+    for name, executor in executor_nodes.items():
+        builder.add_node(name, executor)
+    
     # ========================================================================
     # Define Graph Flow
     # ========================================================================
@@ -79,64 +117,27 @@ def create_graph(with_persistence=False):
     builder.add_edge(START, "main_assistant")
     
     # Main assistant has conditional edges (to router or END)
-    # This is defined later with should_continue function
+    # This is added below using should_continue (defined at module level)
+    
+    # Router conditionally routes to executors or memory_update using route_to_executor.
+    # The path map is derived from the executor nodes and checked against the
+    # intent registry here, so a bad mapping fails at compile time, not mid-turn.
+    router_paths = [*executor_nodes, "memory_update", "main_assistant"]
+    _validate_intent_registry(executor_nodes, router_paths)
     
-    # Router conditionally routes to executors or memory_update using route_to_executor
     builder.add_conditional_edges(
         "router",
         route_to_executor,
-        {
-            # Finance executors
-            "finance_add_transaction_executor": "finance_add_transaction_executor",
-            "finance_summary_executor": "finance_summary_executor",
-            "finance_budget_executor": "finance_budget_executor",
-            "finance_goal_executor": "finance_goal_executor",
-            "finance_recurring_executor": "finance_recurring_executor",
-            "finance_advice_executor": "finance_advice_executor",
-            "finance_debt_payoff_executor": "finance_debt_payoff_executor",
-            
-            # Default paths
-            "memory_update": "memory_update",
-            "main_assistant": "main_assistant"
-        }
+        {name: name for name in router_paths}
     )
     
     # All executors flow to memory_update
-    builder.add_edge("finance_add_transaction_executor", "memory_update")
-    builder.add_edge("finance_summary_executor", "memory_update")
-    builder.add_edge("finance_budget_executor", "memory_update")
-    builder.add_edge("finance_goal_executor", "memory_update")
-    builder.add_edge("finance_recurring_executor", "memory_update")
-    builder.add_edge("finance_advice_executor", "memory_update")
-    builder.add_edge("finance_debt_payoff_executor", "memory_update")
+    for name in executor_nodes:
+        builder.add_edge(name, "memory_update")
     
     # Memory update flows back to main assistant for final response
     builder.add_edge("memory_update", "main_assistant")
     
-    # Define termination condition - END after main_assistant gives final response
-    def should_continue(state: MessagesState) -> Literal["router", END]:
-        """Determine if conversation should continue or end."""
-        last_message = state["messages"][-1]
-        
-        # Check if last message is from assistant
-        if hasattr(last_message, 'type') and last_message.type == "ai":
-            # If it has tool calls, route them
-            if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-                # Check for RouteIntent tool calls
-                has_route_intent = any(
-                    tc.get("name") == "RouteIntent" 
-                    for tc in last_message.tool_calls
-                )
-                
-                if has_route_intent:
-                    return "router"
-            
-            # No tool calls = final response, end conversation
-            return END
-        
-        # Default to END if unsure (safety)
-        return END
-    
     # Add conditional edge from main_assistant
     builder.add_conditional_edges("main_assistant", should_continue)
     
@@ -147,9 +148,13 @@ def create_graph(with_persistence=False):
         from langgraph.checkpoint.memory import MemorySaver
         from langgraph.store.memory import InMemoryStore
         
+        checkpointer = checkpointer or MemorySaver()
+        store = store or InMemoryStore()
+    
+    if checkpointer is not None or store is not None:
         graph = builder.compile(
-            checkpointer=MemorySaver(),
-            store=InMemoryStore()
+            checkpointer=checkpointer,
+            store=store
         )
     else:
         # No persistence - Studio will provide it
@@ -158,5 +163,92 @@ def create_graph(with_persistence=False):
     return graph
 
 
-# Create the graph instance for LangGraph Studio (no persistence)
-graph = create_graph(with_persistence=False)
\ No newline at end of file
+def _validate_intent_registry(executor_nodes, router_paths):
+    """
+    Check that the intent registry and the graph's executor nodes agree.
+    
+    Every executor node must be reachable from some intent, and every
+    domain with executors in the graph must route only to known nodes.
+    Domains with no executors yet (e.g. todo) are skipped.
+    
+    Raises:
+        ValueError: If the registry and the graph disagree
+    """
+    registry_targets = {
+        target
+        for intents in INTENT_REGISTRY.values()
+        for target in intents.values()
+    }
+    
+    unreachable = [name for name in executor_nodes if name not in registry_targets]
+    if unreachable:
+        raise ValueError(f"Executor nodes with no intent in INTENT_REGISTRY: {unreachable}")
+    
+    for assistant_type, intents in INTENT_REGISTRY.items():
+        targets = set(intents.values())
+        if not targets & set(executor_nodes):
+            continue
+        
+        missing = sorted(targets - set(router_paths))
+        if missing:
+            raise ValueError(
+                f"INTENT_REGISTRY['{assistant_type}'] routes to unknown nodes: {missing}"
+            )
+
+
+_DATA_DIR = Path(__file__).resolve().parent
+
+
+@asynccontextmanager
+async def open_persistent_graph(checkpoint_path=None, store_path=None):
+    """
+    Compile the graph against SQLite-backed persistence.
+    
+    Conversation checkpoints and memories survive restarts, and store
+    reads are indexed lookups instead of scans over an in-memory dict.
+    The connections are bound to the running event loop, so use the
+    graph's async API inside the context.
+    
+    Paths default to the CHECKPOINT_DB_PATH and STORE_DB_PATH environment
+    variables, falling back to files next to this module so the location
+    doesn't depend on the working directory.
+    
+    Args:
+        checkpoint_path: SQLite file for conversation checkpoints
+        store_path: SQLite file for the memory store
+    
+    Yields:
+        Compiled graph with persistent checkpointer and store
+    """
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    from langgraph.store.sqlite import AsyncSqliteStore
+    
+    checkpoint_path = str(
+        checkpoint_path
+        or os.getenv("CHECKPOINT_DB_PATH")
+        or _DATA_DIR / "checkpoints.sqlite"
+    )
+    store_path = str(
+        store_path
+        or os.getenv("STORE_DB_PATH")
+        or _DATA_DIR / "store.sqlite"
+    )
+    
+    async with AsyncSqliteSaver.from_conn_string(checkpoint_path) as checkpointer, \
+            AsyncSqliteStore.from_conn_string(store_path) as store:
+        await store.setup()
+        yield create_graph(checkpointer=checkpointer, store=store)
+
+
+def __getattr__(name):
+    """
+    Compile the LangGraph Studio graph instance (no persistence) on first access.
+    
+    Entry points that build their own graph via create_graph() don't pay
+    for compiling this one at import time.
+    """
+    if name == "graph":
+        graph = create_graph(with_persistence=False)
+        globals()["graph"] = graph
+        return graph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,19 +1,36 @@
 """
 Executor nodes package.
+
+Executors are imported lazily on first attribute access (PEP 562) so that
+importing the package doesn't pull in every executor and its LLM client.
 """
 
-from .finance_add_transaction import finance_add_transaction_executor
-from .finance_summary import finance_summary_executor
-from .finance_budget import finance_budget_executor
-from .finance_goal import finance_goal_executor
-from .finance_recurring import finance_recurring_executor
-from .finance_advice import finance_advice_executor
-
-__all__ = [
-    "finance_add_transaction_executor",
-    "finance_summary_executor",
-    "finance_budget_executor",
-    "finance_goal_executor",
-    "finance_recurring_executor",
-    "finance_advice_executor",
-]
\ No newline at end of file
+import importlib
+
+# Maps each exported executor to the module that defines it
+_EXECUTOR_MAP = {
+    "finance_add_transaction_executor": "finance_add_transaction",
+    "finance_summary_executor": "finance_summary",
+    "finance_budget_executor": "finance_budget",
+    "finance_goal_executor": "finance_goal",
+    "finance_recurring_executor": "finance_recurring",
+    "finance_advice_executor": "finance_advice",
+    "finance_debt_payoff_executor": "finance_debt_payoff",
+}
+
+__all__ = list(_EXECUTOR_MAP)
+
+
+def __getattr__(name):
+    """Import an executor module the first time one of its exports is accessed."""
+    if name not in _EXECUTOR_MAP:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    module = importlib.import_module(f".{_EXECUTOR_MAP[name]}", __name__)
+    executor = getattr(module, name)
+    globals()[name] = executor
+    return executor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
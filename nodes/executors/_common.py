@@ -0,0 +1,20 @@
+"""
+Shared helpers for executor nodes.
+"""
+
+
+def _first_tool_call_id(message):
+    """
+    Get the ID of the first tool call on a message.
+    
+    Args:
+        message: Message that routed to the executor (normally an AIMessage)
+        
+    Returns:
+        Tool call ID, or None if the message has no tool calls
+    """
+    try:
+        tool_call = message.tool_calls[0]
+        return tool_call["id"] if isinstance(tool_call, dict) else tool_call.id
+    except (AttributeError, IndexError, KeyError, TypeError):
+        return None
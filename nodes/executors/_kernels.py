@@ -0,0 +1,108 @@
+"""
+Numeric kernels for executor calculations.
+
+Kernels are pure functions over plain floats, ints and lists: no Pydantic
+models, dicts or I/O. This keeps the hot loops small and self-contained
+(and compilable as-is should a JIT such as Numba be adopted later).
+"""
+
+
+def amortize_schedule(
+    initial_debt: float,
+    monthly_rate: float,
+    months: int,
+    regular_payment: float,
+    savings_amount: float,
+    one_time_by_month: list
+):
+    """
+    Run the month-by-month debt amortization.
+    
+    Each month, in strict order (all amounts in exact integer cents):
+    1. interest = balance * rate, rounded half up to the cent
+    2. total_payment = regular + one_time
+    3. balance = balance + interest - payment
+    4. if balance <= 0: trim the payment (one-time first), zero the balance and STOP
+    
+    Args:
+        initial_debt: Starting balance
+        monthly_rate: Monthly interest rate as decimal
+        months: Number of months to simulate
+        regular_payment: Regular monthly payment
+        savings_amount: Monthly savings (only accumulated into the total)
+        one_time_by_month: One-time payment per month, indexed by month
+            (length months + 1; index 0 unused)
+        
+    Returns:
+        Tuple of (schedule, total_interest, total_saved, total_regular, total_one_time)
+        where schedule is a list of (month, regular, one_time, total, interest,
+        balance) tuples, one per simulated month
+    """
+    
+    # Work in integer cents (and the rate in millionths) so every step is
+    # exact; amounts are converted back to floats only when rows are emitted
+    balance_c = int(round(initial_debt * 100))
+    regular_c = int(round(regular_payment * 100))
+    savings_c = int(round(savings_amount * 100))
+    rate_micro = int(round(monthly_rate * 1_000_000))
+    
+    one_time_c = [int(round(amount * 100)) for amount in one_time_by_month]
+    
+    schedule = [None] * months
+    total_interest_c = 0
+    total_regular_c = 0
+    total_one_time_c = 0
+    month = 0
+    
+    for month in range(1, months + 1):
+        # Step 1: Interest FIRST (rounded half up to the cent)
+        interest_c = (balance_c * rate_micro + 500_000) // 1_000_000
+        
+        # Step 2: Payment
+        paid_regular_c = regular_c
+        paid_one_time_c = one_time_c[month]
+        
+        # Step 3: New balance
+        new_balance_c = balance_c + interest_c - paid_regular_c - paid_one_time_c
+        
+        # Step 4: Early payoff check - trim the overpayment, one-time first
+        if new_balance_c < 0:
+            overpaid_c = -new_balance_c
+            
+            if paid_one_time_c > 0:
+                reduction_c = min(paid_one_time_c, overpaid_c)
+                paid_one_time_c -= reduction_c
+                paid_regular_c -= overpaid_c - reduction_c
+            else:
+                paid_regular_c = balance_c + interest_c
+            
+            new_balance_c = 0
+        
+        # Update totals
+        total_interest_c += interest_c
+        total_regular_c += paid_regular_c
+        total_one_time_c += paid_one_time_c
+        
+        schedule[month - 1] = (
+            month,
+            paid_regular_c / 100,
+            paid_one_time_c / 100,
+            (paid_regular_c + paid_one_time_c) / 100,
+            interest_c / 100,
+            new_balance_c / 100
+        )
+        
+        balance_c = new_balance_c
+        
+        # STOP if cleared
+        if balance_c <= 0:
+            del schedule[month:]
+            break
+    
+    return (
+        schedule,
+        total_interest_c / 100,
+        savings_c * month / 100,
+        total_regular_c / 100,
+        total_one_time_c / 100
+    )
@@ -9,9 +9,10 @@ from langgraph.graph import MessagesState
 from langgraph.store.base import BaseStore
 
 from configuration import Configuration
+from nodes.executors._common import _first_tool_call_id
 
 
-def finance_add_transaction_executor(state: MessagesState, config: RunnableConfig, store: BaseStore):
+async def finance_add_transaction_executor(state: MessagesState, config: RunnableConfig, store: BaseStore):
     """
     Execute transaction addition/update operation.
     
@@ -33,11 +34,9 @@ def finance_add_transaction_executor(state: MessagesState, config: RunnableConfi
     # Get the last message with the tool call
     last_message = state["messages"][-1]
     
-    if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-        # Get tool call ID
-        tool_call = last_message.tool_calls[0]
-        tool_call_id = tool_call.get("id") if isinstance(tool_call, dict) else getattr(tool_call, "id", "unknown")
-        
+    tool_call_id = _first_tool_call_id(last_message)
+    
+    if tool_call_id is not None:
         # Return confirmation message as a dict (not ToolMessage object)
         return {
             "messages": [{
@@ -10,7 +10,8 @@ from langgraph.graph import MessagesState
 from langgraph.store.base import BaseStore
 
 from configuration import Configuration
-from utils.store_utils import get_all_memories_by_type
+from nodes.executors._common import _first_tool_call_id
+from utils.store_utils import aget_memories_by_types
 
 # Import the custom LLM wrapper
 import sys
@@ -19,7 +20,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 from safe_llm import LLM_chat
 
 
-def finance_advice_executor(state: MessagesState, config: RunnableConfig, store: BaseStore):
+async def finance_advice_executor(state: MessagesState, config: RunnableConfig, store: BaseStore):
     """
     Generate financial advice based on user's financial data.
     
@@ -40,25 +41,28 @@ def finance_advice_executor(state: MessagesState, config: RunnableConfig, store:
     user_id = configurable.user_id
     assistant_type = configurable.assistant_type
     
-    # Gather all financial data
-    transactions = get_all_memories_by_type(store, "finance_transactions", assistant_type, user_id)
-    budgets = get_all_memories_by_type(store, "finance_budgets", assistant_type, user_id)
-    goals = get_all_memories_by_type(store, "finance_goals", assistant_type, user_id)
-    recurring = get_all_memories_by_type(store, "finance_recurring_payments", assistant_type, user_id)
+    # Gather all financial data (one batched store call)
+    transactions, budgets, goals, recurring = await aget_memories_by_types(
+        store,
+        [
+            "finance_transactions",
+            "finance_budgets",
+            "finance_goals",
+            "finance_recurring_payments"
+        ],
+        assistant_type,
+        user_id
+    )
     
     # Build context for advice
-    context_parts = []
-    
-    if transactions:
-        context_parts.append(f"Transactions: {len(transactions)} recorded")
-    if budgets:
-        context_parts.append(f"Budgets: {[b.value for b in budgets]}")
-    if goals:
-        context_parts.append(f"Goals: {[g.value for g in goals]}")
-    if recurring:
-        context_parts.append(f"Recurring Payments: {[r.value for r in recurring]}")
+    context = _build_context(transactions, budgets, goals, recurring)
     
-    context = "\n".join(context_parts) if context_parts else "No financial data available yet."
+    # The user's request is the latest human message; scanning from the end
+    # keeps the lookup independent of history length
+    question = next(
+        (msg.content for msg in reversed(state["messages"]) if msg.type == "human"),
+        "General advice"
+    )
     
     # Create advice prompt
     advice_prompt = f"""Based on the user's financial data below, provide helpful, actionable financial advice.
@@ -66,7 +70,7 @@ def finance_advice_executor(state: MessagesState, config: RunnableConfig, store:
 Financial Data:
 {context}
 
-User's Question/Request: {state['messages'][-2].content if len(state['messages']) > 1 else 'General advice'}
+User's Question/Request: {question}
 
 Provide:
 1. Key insights about their financial situation
@@ -77,14 +81,14 @@ Provide:
 Be supportive, practical, and specific."""
     
     # Generate advice using LLM
-    advice_response = LLM_chat.invoke([SystemMessage(content=advice_prompt)])
+    advice_response = await LLM_chat.ainvoke([SystemMessage(content=advice_prompt)])
     
     # Get the last message with the tool call
     last_message = state["messages"][-1]
     
-    if last_message.tool_calls:
-        tool_call_id = last_message.tool_calls[0].get("id")
-        
+    tool_call_id = _first_tool_call_id(last_message)
+    
+    if tool_call_id is not None:
         # Return advice as tool response
         return {
             "messages": [{
@@ -95,3 +99,27 @@ Be supportive, practical, and specific."""
         }
     
     return {"messages": []}
+
+
+def _build_context(transactions, budgets, goals, recurring) -> str:
+    """
+    Describe the user's financial data for the advice prompt.
+    
+    Args:
+        transactions, budgets, goals, recurring: Store items for each memory type
+        
+    Returns:
+        Context string describing the user's financial data
+    """
+    context_parts = []
+    
+    if transactions:
+        context_parts.append(f"Transactions: {len(transactions)} recorded")
+    if budgets:
+        context_parts.append(f"Budgets: {[b.value for b in budgets]}")
+    if goals:
+        context_parts.append(f"Goals: {[g.value for g in goals]}")
+    if recurring:
+        context_parts.append(f"Recurring Payments: {[r.value for r in recurring]}")
+    
+    return "\n".join(context_parts) if context_parts else "No financial data available yet."
@@ -12,16 +12,24 @@ ENGINEERING AUDIT COMPLETED ✅
 Returns PURE JSON - formatting happens in presentation layer.
 """
 
+import logging
+import math
 import re
-import json
+import traceback
+import uuid
 from datetime import datetime
 from langchain_core.messages import SystemMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import MessagesState
 from langgraph.store.base import BaseStore
+from pydantic_core import to_json
 
 from configuration import Configuration
+from nodes.executors._common import _first_tool_call_id
 from schemas.finance_debt_plan import FinanceDebtPlan, MonthlyPaymentRow, OneTimePayment
+from nodes.executors._kernels import amortize_schedule
+from utils import json_utils
+from utils.store_utils import asave_memory
 
 import sys
 import os
@@ -29,7 +37,51 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 from safe_llm import LLM_chat
 
 
-def finance_debt_payoff_executor(state: MessagesState, config: RunnableConfig, store: BaseStore):
+logger = logging.getLogger(__name__)
+
+# Patterns compiled once at import
+_DEBT_RE = re.compile(r'(\d+[,\s]?\d*)\s*egp.*?debt')
+_RATE_RE = re.compile(r'(\d+\.?\d*)\s*%.*?interest')
+_SALARY_RE = re.compile(r'salary.*?(\d+[,\s]?\d*)')
+_EXPENSE_RE = re.compile(r'expenses.*?(\d+[,\s]?\d*)')
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*')
+# "12 months" sets the plan length, "by 3 months" extends it
+_MONTHS_RE = re.compile(r'(\bby\s+)?(\d+)\s*months?\b', re.I)
+_WORD_RE = re.compile(r"[a-z']+")
+
+# Follow-ups that may reuse the previous plan's parameters without an LLM
+# call: every word must come from this vocabulary, and the message must
+# either ask for the same plan or only change its length
+_FOLLOW_UP_WORDS = frozenset({
+    "show", "me", "that", "it", "the", "plan", "again", "same", "repeat",
+    "redo", "recalculate", "please", "can", "could", "you", "display", "one",
+    "more", "time", "what", "about", "how", "make", "over", "for", "in",
+    "instead", "extend", "try", "with", "a", "do", "let's", "lets", "see",
+    "to", "my", "debt", "payoff", "ok", "okay", "and", "then", "of"
+})
+_SAME_PLAN_WORDS = frozenset({"again", "same", "repeat", "redo", "recalculate"})
+
+# Parameters every plan needs
+_REQUIRED_PARAMS = ("salary", "fixed_expenses", "debt_amount", "interest_rate_percent", "months")
+
+# Parameter extraction prompt ({context_info} is filled per call)
+_EXTRACTION_PROMPT = """Extract financial parameters. {context_info}
+
+Return ONLY JSON:
+{{
+    "salary": <number>,
+    "fixed_expenses": <number>,
+    "debt_amount": <number>,
+    "interest_rate_percent": <number>,
+    "months": <number>,
+    "savings_rate_percent": <number>,
+    "currency": "EGP",
+    "one_time_payments": [{{"month": N, "amount": X, "description": "..."}}]
+}}
+NO text. ONLY JSON."""
+
+
+async def finance_debt_payoff_executor(state: MessagesState, config: RunnableConfig, store: BaseStore):
     """
     Execute debt payoff calculation - PURE JSON output.
     
@@ -40,25 +92,29 @@ def finance_debt_payoff_executor(state: MessagesState, config: RunnableConfig, s
     configurable = Configuration.from_runnable_config(config)
     user_id = configurable.user_id
     assistant_type = configurable.assistant_type
+    tool_call_id = _first_tool_call_id(state["messages"][-1])
+    
+    # One clock read for the plan date, metadata and storage key
+    now = datetime.now()
     
-    params = _extract_parameters(state)
+    params = await _extract_parameters(state, configurable.history_lookback)
     
     if not params:
         return {
             "messages": [{
                 "role": "tool",
-                "content": json.dumps({
+                "content": json_utils.dumps({
                     "status": "error",
                     "error": "parameter_extraction_failed",
                     "required": ["salary", "fixed_expenses", "debt_amount", "interest_rate", "months"]
                 }),
-                "tool_call_id": state["messages"][-1].tool_calls[0].get("id")
+                "tool_call_id": tool_call_id
             }]
         }
     
     try:
         # Calculate (deterministic Python)
-        plan = _calculate_debt_payoff_plan(params)
+        plan = _calculate_debt_payoff_plan(params, now)
         
         # Validate
         validation_errors = _validate_plan(plan, params)
@@ -67,89 +123,97 @@ def finance_debt_payoff_executor(state: MessagesState, config: RunnableConfig, s
             return {
                 "messages": [{
                     "role": "tool",
-                    "content": json.dumps({
+                    "content": to_json({
                         "status": "error",
                         "error": "validation_failed",
                         "validation_errors": validation_errors,
-                        "plan": plan.model_dump(mode="json")
-                    }),
-                    "tool_call_id": state["messages"][-1].tool_calls[0].get("id")
+                        "plan": plan
+                    }).decode(),
+                    "tool_call_id": tool_call_id
                 }]
             }
         
         # Store
-        _store_plan(store, plan, assistant_type, user_id)
+        await _store_plan(store, plan, assistant_type, user_id, now)
         
-        # Return PURE JSON
+        # Return PURE JSON (the plan is serialized by pydantic-core directly,
+        # without an intermediate dict)
         return {
             "messages": [{
                 "role": "tool",
-                "content": json.dumps({
+                "content": to_json({
                     "status": "success",
-                    "plan": plan.model_dump(mode="json"),
+                    "plan": plan,
                     "metadata": {
                         "version": "2.1_audited",
-                        "calculated_at": datetime.now().isoformat()
+                        "currency": params.get("currency", "EGP"),
+                        "calculated_at": now.isoformat()
                     }
-                }),
-                "tool_call_id": state["messages"][-1].tool_calls[0].get("id")
+                }).decode(),
+                "tool_call_id": tool_call_id
             }]
         }
         
     except Exception as e:
-        import traceback
         return {
             "messages": [{
                 "role": "tool",
-                "content": json.dumps({
+                "content": json_utils.dumps({
                     "status": "error",
                     "error": str(e),
                     "traceback": traceback.format_exc()
                 }),
-                "tool_call_id": state["messages"][-1].tool_calls[0].get("id")
+                "tool_call_id": tool_call_id
             }]
         }
 
 
-def _extract_parameters(state: MessagesState) -> dict:
+async def _extract_parameters(state: MessagesState, lookback: int = 20) -> dict:
     """Extract with context awareness."""
     
     all_messages = state["messages"]
-    previous_params = _find_previous_parameters(all_messages)
+    previous_params = _find_previous_parameters(all_messages, lookback)
+    
+    # Fast path: complete previous params and an explicit "same plan" or
+    # plan-length-only follow-up - reuse them without an LLM round-trip
+    if previous_params and all(previous_params.get(k) is not None for k in _REQUIRED_PARAMS):
+        last_human = next((msg for msg in reversed(all_messages) if msg.type == "human"), None)
+        content = last_human.content if last_human is not None and isinstance(last_human.content, str) else ""
+        months_m = _MONTHS_RE.search(content)
+        
+        if _is_plan_follow_up(content, months_m is not None):
+            params = dict(previous_params)
+            if months_m:
+                extend_by, value = months_m.groups()
+                params["months"] = int(params["months"]) + int(value) if extend_by else int(value)
+            
+            params.setdefault("savings_rate_percent", 10)
+            params.setdefault("currency", "EGP")
+            params.setdefault("one_time_payments", [])
+            
+            print(f"✅ Reused previous parameters (months={params['months']})")
+            return params
+    
     recent_messages = all_messages[-10:] if len(all_messages) > 10 else all_messages
     
     context_info = ""
     if previous_params:
         context_info = f"""Previous: salary={previous_params.get('salary')}, debt={previous_params.get('debt_amount')}, rate={previous_params.get('interest_rate_percent')}%"""
     
-    extraction_prompt = f"""Extract financial parameters. {context_info}
-
-Return ONLY JSON:
-{{
-    "salary": <number>,
-    "fixed_expenses": <number>,
-    "debt_amount": <number>,
-    "interest_rate_percent": <number>,
-    "months": <number>,
-    "savings_rate_percent": <number>,
-    "currency": "EGP",
-    "one_time_payments": [{{"month": N, "amount": X, "description": "..."}}]
-}}
-NO text. ONLY JSON."""
+    extraction_prompt = _EXTRACTION_PROMPT.format(context_info=context_info)
     
     try:
-        response = LLM_chat.invoke([SystemMessage(content=extraction_prompt)] + recent_messages)
+        response = await LLM_chat.ainvoke([SystemMessage(content=extraction_prompt)] + recent_messages)
         content = response.content.strip()
         
-        content = re.sub(r'```json\s*', '', content)
-        content = re.sub(r'```\s*', '', content).strip()
+        content = _JSON_FENCE_RE.sub('', content).strip()
         
         start = content.find('{')
         end = content.rfind('}')
         if start != -1 and end != -1:
             content = content[start:end+1]
         
-        params = json.loads(content)
+        params = json_utils.loads(content)
         
         # Merge with previous
         if previous_params:
@@ -161,8 +225,7 @@ NO text. ONLY JSON."""
         params.setdefault("currency", "EGP")
         params.setdefault("one_time_payments", [])
         
-        required = ["salary", "fixed_expenses", "debt_amount", "interest_rate_percent", "months"]
-        if not all(k in params for k in required):
+        if not all(k in params for k in _REQUIRED_PARAMS):
             return None
         
         print(f"✅ Extracted: {list(params.keys())}")
@@ -173,15 +236,41 @@ NO text. ONLY JSON."""
         return None
 
 
-def _calculate_debt_payoff_plan(params: dict) -> FinanceDebtPlan:
+def _is_plan_follow_up(content: str, has_months: bool) -> bool:
+    """
+    True when a message only asks for the previous plan again, or only
+    changes its length ("12 months", "extend it by 3 months").
+    
+    Anything else - new figures, or qualitative changes such as "drop the
+    bonus" or "switch to USD" - needs a fresh extraction.
+    """
+    rest = _MONTHS_RE.sub(" ", content.lower())
+    if any(ch.isdigit() for ch in rest):
+        return False
+    
+    words = set(_WORD_RE.findall(rest))
+    if not words <= _FOLLOW_UP_WORDS:
+        return False
+    
+    return has_months or bool(words & _SAME_PLAN_WORDS)
+
+
+def _calculate_debt_payoff_plan(params: dict, now: datetime = None) -> FinanceDebtPlan:
     """
-    DETERMINISTIC calculation with strict order:
-    1. interest = round(balance * rate, 2)
+    DETERMINISTIC calculation with strict order (exact integer cents):
+    1. interest = balance * rate, rounded half up to the cent
     2. total_payment = regular + one_time
-    3. balance = round(balance + interest - payment, 2)
+    3. balance = balance + interest - payment
     4. if balance <= 0: adjust and STOP
+    
+    Half-up rounding is deliberate: the old float round() could land a
+    cent either way on ties, so some plans now differ from it by a cent.
+    
+    `now` is the calculation time used for created_date (defaults to now).
     """
     
+    created_date = (now or datetime.now()).strftime("%Y-%m-%d")
+    
     # Parse params
     salary = round(float(params["salary"]), 2)
     fixed_expenses = round(float(params["fixed_expenses"]), 2)
@@ -198,7 +287,9 @@ def _calculate_debt_payoff_plan(params: dict) -> FinanceDebtPlan:
     
     # Parse one-time payments
     one_time_payments = []
-    one_time_by_month = {}
+    # Dense per-month amounts (index 0 unused); months outside the plan are
+    # kept in one_time_payments for validation but never paid
+    one_time_by_month = [0.0] * (months + 1)
     
     for otp in params.get("one_time_payments", []):
         if isinstance(otp, dict) and "month" in otp and "amount" in otp:
@@ -207,106 +298,61 @@ def _calculate_debt_payoff_plan(params: dict) -> FinanceDebtPlan:
             desc = otp.get("description", "One-time payment")
             
             one_time_payments.append(OneTimePayment(month=m, amount=amt, description=desc))
-            one_time_by_month[m] = amt
-    
-    print(f"\n{'='*80}\n💰 CALCULATION\n{'='*80}")
-    print(f"Debt: {initial_debt:,.2f}, Rate: {rate_percent}%, Regular: {regular_payment:,.2f}")
-    print(f"Bonuses: {one_time_by_month}\n")
-    
-    # Calculate
-    monthly_rows = []
-    balance = initial_debt
-    total_interest = 0.0
-    total_saved = 0.0
-    total_regular = 0.0
-    total_one_time = 0.0
-    
-    for month in range(1, months + 1):
-        # Step 1: Interest FIRST
-        interest = round(balance * monthly_rate, 2)
-        
-        # Step 2: Payment
-        one_time = one_time_by_month.get(month, 0.0)
-        tentative_regular = regular_payment
-        tentative_one_time = one_time
-        tentative_total = round(regular_payment + one_time, 2)
-        
-        # Step 3: New balance
-        new_balance = round(balance + interest - tentative_total, 2)
-        
-        print(f"M{month}: {balance:,.2f} + {interest:,.2f} - {tentative_total:,.2f} = {new_balance:,.2f}")
-        
-        # Step 4: Early payoff check
-        if new_balance < 0:
-            needed = round(balance + interest, 2)
-            
-            if tentative_one_time > 0:
-                reduction = min(tentative_one_time, abs(new_balance))
-                tentative_one_time = round(tentative_one_time - reduction, 2)
-                remaining_over = abs(new_balance) - reduction
-                
-                if remaining_over > 0:
-                    tentative_regular = round(tentative_regular - remaining_over, 2)
-            else:
-                tentative_regular = round(needed, 2)
-            
-            tentative_total = round(tentative_regular + tentative_one_time, 2)
-            new_balance = 0.0
-            
-            print(f"  → EARLY PAYOFF: adjusted to {tentative_total:,.2f}")
-        
-        # Update totals
-        total_interest = round(total_interest + interest, 2)
-        total_saved = round(total_saved + savings_amount, 2)
-        total_regular = round(total_regular + tentative_regular, 2)
-        total_one_time = round(total_one_time + tentative_one_time, 2)
-        
-        # Store row
-        monthly_rows.append(MonthlyPaymentRow(
+            if 1 <= m <= months:
+                one_time_by_month[m] = amt
+    
+    # Calculate (pure numeric kernel; Pydantic rows are built afterwards)
+    schedule, total_interest, total_saved, total_regular, total_one_time = amortize_schedule(
+        initial_debt,
+        monthly_rate,
+        months,
+        regular_payment,
+        savings_amount,
+        one_time_by_month
+    )
+    
+    # Month-by-month trace (formatted only when debug logging is on)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            f"💰 CALCULATION - Debt: {initial_debt:,.2f}, Rate: {rate_percent}%, "
+            f"Regular: {regular_payment:,.2f}, "
+            f"Bonuses: { {m: amt for m, amt in enumerate(one_time_by_month) if amt} }"
+        )
+        prev_balance = initial_debt
+        for month, regular, one_time, total, interest, remaining in schedule:
+            logger.debug(f"M{month}: {prev_balance:,.2f} + {interest:,.2f} - {total:,.2f} = {remaining:,.2f}")
+            prev_balance = remaining
+    
+    balance = schedule[-1][5] if schedule else initial_debt
+    
+    # Rows come straight from the deterministic kernel, so skip per-row validation
+    monthly_rows = [
+        MonthlyPaymentRow.model_construct(
             month=month,
             salary=salary,
             fixed_expenses=fixed_expenses,
             savings_amount=savings_amount,
-            debt_payment=tentative_regular,
-            one_time_payment=tentative_one_time,
-            total_payment=tentative_total,
+            debt_payment=regular,
+            one_time_payment=one_time,
+            total_payment=total,
             interest_charged=interest,
-            remaining_balance=new_balance
-        ))
-        
-        balance = new_balance
-        
-        # STOP if cleared
-        if balance <= 0:
-            print(f"\n✅ Cleared in {month} months\n{'='*80}\n")
-            
-            return FinanceDebtPlan(
-                plan_name=f"{months}-Month Debt Payoff Plan",
-                salary=salary,
-                fixed_expenses=fixed_expenses,
-                initial_debt=initial_debt,
-                monthly_interest_rate=monthly_rate,
-                months=months,
-                savings_rate=savings_rate,
-                one_time_payments=one_time_payments,
-                monthly_rows=monthly_rows,
-                final_balance=0.0,
-                total_saved=total_saved,
-                total_interest_paid=total_interest,
-                total_regular_payments=total_regular,
-                total_one_time_payments=total_one_time,
-                is_debt_cleared=True,
-                months_to_payoff=month,
-                recommended_payment=None,
-                created_date=datetime.now().strftime("%Y-%m-%d"),
-                payoff_strategy="standard"
-            )
+            remaining_balance=remaining
+        )
+        for month, regular, one_time, total, interest, remaining in schedule
+    ]
     
-    # Not cleared
-    print(f"\n⚠️ Not cleared. Remaining: {balance:,.2f}\n{'='*80}\n")
-    
-    total_bonus = sum(otp.amount for otp in one_time_payments)
-    recommended = _calc_required_payment(initial_debt, monthly_rate, months, total_bonus)
+    cleared = balance <= 0
+    if cleared:
+        months_to_payoff = len(schedule)
+        final_balance = 0.0
+        recommended = None
+        print(f"✅ Debt plan: cleared in {months_to_payoff} months")
+    else:
+        months_to_payoff = None
+        final_balance = balance
+        total_bonus = sum(otp.amount for otp in one_time_payments)
+        recommended = _calc_required_payment(initial_debt, monthly_rate, months, total_bonus)
+        print(f"⚠️ Debt plan: not cleared. Remaining: {balance:,.2f}")
     
     return FinanceDebtPlan(
         plan_name=f"{months}-Month Debt Payoff Plan",
@@ -318,31 +364,44 @@ def _calculate_debt_payoff_plan(params: dict) -> FinanceDebtPlan:
         savings_rate=savings_rate,
         one_time_payments=one_time_payments,
         monthly_rows=monthly_rows,
-        final_balance=balance,
+        final_balance=final_balance,
         total_saved=total_saved,
         total_interest_paid=total_interest,
         total_regular_payments=total_regular,
         total_one_time_payments=total_one_time,
-        is_debt_cleared=False,
-        months_to_payoff=None,
+        is_debt_cleared=cleared,
+        months_to_payoff=months_to_payoff,
         recommended_payment=recommended,
-        created_date=datetime.now().strftime("%Y-%m-%d"),
+        created_date=created_date,
         payoff_strategy="standard"
     )
 
 
 def _calc_required_payment(debt: float, rate: float, months: int, bonus: float = 0) -> float:
-    """Calculate required payment."""
-    if rate == 0:
+    """
+    Calculate required payment.
+    
+    Uses 1 - (1 + rate)^-months = -expm1(-months * log1p(rate)), which stays
+    accurate for tiny rates where the direct form cancels catastrophically.
+    """
+    if abs(rate) < 1e-9:
         return round(max(0, (debt - bonus) / months), 2)
     
     effective = max(0, debt - bonus)
-    payment = (rate * effective) / (1 - (1 + rate) ** -months)
+    denom = -math.expm1(-months * math.log1p(rate))
+    payment = (rate * effective) / denom
     return round(payment, 2)
 
 
 def _validate_plan(plan: FinanceDebtPlan, params: dict) -> list[str]:
-    """STRICT validation with guardrails."""
+    """
+    STRICT validation with guardrails.
+    
+    Beyond the inputs (cash flow, one-time payment months), the finished
+    plan must reconcile: every row's balance follows from the previous
+    one, the totals equal the sums of the rows, and a plan that stops
+    before its last month has cleared the debt.
+    """
     errors = []
     
     # Cash flow check
@@ -360,63 +419,92 @@ def _validate_plan(plan: FinanceDebtPlan, params: dict) -> list[str]:
         if otp.month < 1 or otp.month > plan.months:
             errors.append(f"Bonus month {otp.month} outside 1-{plan.months}")
     
-    # Month-by-month checks
-    prev_balance = round(plan.initial_debt, 2)
+    # Month-by-month checks (in cents, so rounding can't hide a mismatch)
+    prev_balance_c = round(plan.initial_debt * 100)
+    interest_c = regular_c = one_time_c = 0
     
     for row in plan.monthly_rows:
-        # No negative balance
-        if row.remaining_balance < -0.01:
-            errors.append(f"M{row.month}: Negative balance {row.remaining_balance}")
+        row_interest_c = round(row.interest_charged * 100)
+        row_regular_c = round(row.debt_payment * 100)
+        row_one_time_c = round(row.one_time_payment * 100)
+        balance_c = round(row.remaining_balance * 100)
         
-        # Expected balance
-        expected = round(prev_balance + row.interest_charged - row.total_payment, 2)
-        
-        # Balance increase check
-        if row.total_payment >= row.interest_charged:
-            if row.remaining_balance > prev_balance + 0.01:
-                errors.append(
-                    f"M{row.month}: Balance increased. "
-                    f"Prev={prev_balance}, New={row.remaining_balance}"
-                )
+        if balance_c < 0:
+            errors.append(f"M{row.month}: Negative balance {row.remaining_balance}")
         
-        # Calculation accuracy
-        if abs(row.remaining_balance - expected) > 0.02:
+        expected_c = prev_balance_c + row_interest_c - row_regular_c - row_one_time_c
+        if balance_c != expected_c or round(row.total_payment * 100) != row_regular_c + row_one_time_c:
             errors.append(
                 f"M{row.month}: Calc mismatch. "
-                f"Expected={expected}, Got={row.remaining_balance}"
+                f"Expected={expected_c / 100}, Got={row.remaining_balance}"
             )
         
-        prev_balance = row.remaining_balance
+        interest_c += row_interest_c
+        regular_c += row_regular_c
+        one_time_c += row_one_time_c
+        prev_balance_c = balance_c
+    
+    # Totals must reconcile with the rows
+    for label, total, rows_c in (
+        ("interest", plan.total_interest_paid, interest_c),
+        ("regular payments", plan.total_regular_payments, regular_c),
+        ("one-time payments", plan.total_one_time_payments, one_time_c),
+    ):
+        if round(total * 100) != rows_c:
+            errors.append(f"Total {label} {total} != sum of rows {rows_c / 100}")
+    
+    # Stopping early only happens when the debt is cleared
+    if len(plan.monthly_rows) < plan.months and (prev_balance_c != 0 or not plan.is_debt_cleared):
+        errors.append(
+            f"Plan stopped after {len(plan.monthly_rows)} of {plan.months} months "
+            f"with balance {prev_balance_c / 100}"
+        )
     
     return errors
 
 
-def _find_previous_parameters(messages: list) -> dict:
-    """Find previous params from history."""
+def _find_previous_parameters(messages: list, lookback: int = 20) -> dict:
+    """
+    Find previous params from recent history.
     
-    # Check tool messages
-    for msg in reversed(messages):
-        if hasattr(msg, 'type') and msg.type == "tool":
-            if hasattr(msg, 'content') and msg.content:
-                try:
-                    data = json.loads(msg.content)
-                    if data.get('status') == 'success' and 'plan' in data:
-                        plan = data['plan']
-                        return {
-                            'salary': plan.get('salary'),
-                            'fixed_expenses': plan.get('fixed_expenses'),
-                            'debt_amount': plan.get('initial_debt'),
-                            'interest_rate_percent': round(plan.get('monthly_interest_rate', 0) * 100, 2),
-                            'months': plan.get('months'),
-                            'savings_rate_percent': round(plan.get('savings_rate', 0) * 100, 2),
-                            'currency': 'EGP'
-                        }
-                except:
-                    pass
+    Scans the last `lookback` messages newest-first in a single pass. The
+    latest successful plan (tool message) wins and ends the scan; otherwise
+    the latest human message stating all parameters is used.
+    """
+    
+    human_params = None
     
-    # Parse human messages
-    for msg in reversed(messages):
-        if hasattr(msg, 'type') and msg.type == "human":
+    for msg in reversed(messages[-lookback:]):
+        msg_type = getattr(msg, 'type', None)
+        
+        # Check tool messages (only JSON objects can hold a plan)
+        if msg_type == "tool":
+            content = getattr(msg, 'content', None)
+            if not isinstance(content, str) or not content.startswith('{'):
+                continue
+            try:
+                data = json_utils.loads(content)
+                if data.get('status') == 'success' and 'plan' in data:
+                    plan = data['plan']
+                    metadata = data.get('metadata') or {}
+                    return {
+                        'salary': plan.get('salary'),
+                        'fixed_expenses': plan.get('fixed_expenses'),
+                        'debt_amount': plan.get('initial_debt'),
+                        'interest_rate_percent': round(plan.get('monthly_interest_rate', 0) * 100, 2),
+                        'months': plan.get('months'),
+                        'savings_rate_percent': round(plan.get('savings_rate', 0) * 100, 2),
+                        'one_time_payments': [
+                            {k: otp[k] for k in ('month', 'amount', 'description') if k in otp}
+                            for otp in plan.get('one_time_payments') or []
+                        ],
+                        'currency': metadata.get('currency', 'EGP')
+                    }
+            except:
+                pass
+        
+        # Parse human messages (keep the most recent match as a fallback)
+        elif msg_type == "human" and human_params is None:
             content = ""
             if hasattr(msg, 'content'):
                 if isinstance(msg.content, str):
@@ -427,14 +515,14 @@ def _find_previous_parameters(messages: list) -> dict:
             if not content:
                 continue
             
-            debt_m = re.search(r'(\d+[,\s]?\d*)\s*egp.*?debt', content)
-            rate_m = re.search(r'(\d+\.?\d*)\s*%.*?interest', content)
-            salary_m = re.search(r'salary.*?(\d+[,\s]?\d*)', content)
-            expense_m = re.search(r'expenses.*?(\d+[,\s]?\d*)', content)
+            debt_m = _DEBT_RE.search(content)
+            rate_m = _RATE_RE.search(content)
+            salary_m = _SALARY_RE.search(content)
+            expense_m = _EXPENSE_RE.search(content)
             
             if all([debt_m, rate_m, salary_m, expense_m]):
                 try:
-                    return {
+                    human_params = {
                         'debt_amount': float(debt_m.group(1).replace(',', '').replace(' ', '')),
                         'interest_rate_percent': float(rate_m.group(1)),
                         'salary': float(salary_m.group(1).replace(',', '').replace(' ', '')),
@@ -446,16 +534,17 @@ def _find_previous_parameters(messages: list) -> dict:
                 except:
                     pass
     
-    return {}
+    return human_params or {}
 
 
-def _store_plan(store: BaseStore, plan: FinanceDebtPlan, assistant_type: str, user_id: str):
+async def _store_plan(store: BaseStore, plan: FinanceDebtPlan, assistant_type: str, user_id: str, now: datetime = None):
     """Store plan."""
-    import uuid
-    namespace = ("finance_debt_plans", assistant_type, user_id)
-    key = f"plan_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    now = now or datetime.now()
+    key = f"plan_{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
     
     try:
-        store.put(namespace, key, plan.model_dump(mode="json"))
+        await asave_memory(
+            store, "finance_debt_plans", assistant_type, user_id, key, plan.model_dump(mode="json")
+        )
     except Exception as e:
         print(f"⚠️ Storage failed: {e}")
\ No newline at end of file
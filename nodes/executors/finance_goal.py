@@ -9,9 +9,10 @@ from langgraph.graph import MessagesState
 from langgraph.store.base import BaseStore
 
 from configuration import Configuration
+from nodes.executors._common import _first_tool_call_id
 
 
-def finance_goal_executor(state: MessagesState, config: RunnableConfig, store: BaseStore):
+async def finance_goal_executor(state: MessagesState, config: RunnableConfig, store: BaseStore):
     """
     Execute goal creation/update operation.
     
@@ -33,9 +34,9 @@ def finance_goal_executor(state: MessagesState, config: RunnableConfig, store: B
     # Get the last message with the tool call
     last_message = state["messages"][-1]
     
-    if last_message.tool_calls:
-        tool_call_id = last_message.tool_calls[0].get("id")
-        
+    tool_call_id = _first_tool_call_id(last_message)
+    
+    if tool_call_id is not None:
         # Return confirmation message
         return {
             "messages": [{
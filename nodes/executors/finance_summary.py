@@ -10,11 +10,12 @@ from langgraph.graph import MessagesState
 from langgraph.store.base import BaseStore
 
 from configuration import Configuration
-from utils.store_utils import get_all_memories_by_type
+from nodes.executors._common import _first_tool_call_id
+from utils.store_utils import aget_all_memories_by_type
 from utils.formatting import format_transaction_summary
 
 
-def finance_summary_executor(state: MessagesState, config: RunnableConfig, store: BaseStore):
+async def finance_summary_executor(state: MessagesState, config: RunnableConfig, store: BaseStore):
     """
     Generate financial summary report.
     
@@ -36,7 +37,7 @@ def finance_summary_executor(state: MessagesState, config: RunnableConfig, store
     assistant_type = configurable.assistant_type
     
     # Retrieve all transactions
-    transaction_memories = get_all_memories_by_type(
+    transaction_memories = await aget_all_memories_by_type(
         store, "finance_transactions", assistant_type, user_id
     )
     
@@ -44,11 +45,14 @@ def finance_summary_executor(state: MessagesState, config: RunnableConfig, store
     transactions = [mem.value for mem in transaction_memories]
     
     # Filter for current month (optional - could be parameterized)
-    current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    # Dates are ISO-8601 strings, which sort lexicographically, so a string
+    # compare against the month's first day avoids parsing every transaction.
+    # The cutoff is date-only so "YYYY-MM-01" itself still compares as >=.
+    cutoff = datetime.now().strftime("%Y-%m-01")
     
     current_month_transactions = [
         t for t in transactions 
-        if isinstance(t.get('date'), str) and datetime.fromisoformat(t['date']) >= current_month_start
+        if isinstance(d := t.get('date'), str) and d >= cutoff
     ]
     
     # Generate summary
@@ -57,9 +61,9 @@ def finance_summary_executor(state: MessagesState, config: RunnableConfig, store
     # Get the last message with the tool call
     last_message = state["messages"][-1]
     
-    if last_message.tool_calls:
-        tool_call_id = last_message.tool_calls[0].get("id")
-        
+    tool_call_id = _first_tool_call_id(last_message)
+    
+    if tool_call_id is not None:
         # Return summary as tool response
         return {
             "messages": [{
@@ -7,24 +7,39 @@ This node handles the main conversation flow, loads memories,
 and routes requests to appropriate executors via the router.
 """
 
+import asyncio
 from datetime import datetime
+from functools import lru_cache
 from typing import Literal
 from pydantic import BaseModel, Field
 
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import AIMessage, SystemMessage, trim_messages
 from langchain_core.runnables import RunnableConfig
-from langgraph.graph import MessagesState
+from langgraph.config import get_stream_writer
+from langgraph.graph import MessagesState, END
 from langgraph.store.base import BaseStore
 
 from configuration import Configuration
-from utils.store_utils import get_memory, format_memories, get_all_memories_by_type
+from utils.store_utils import get_memory, format_memories, aget_memories_by_types
 
 
 # Import the custom LLM wrapper
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from safe_llm import LLM_chat
+from safe_llm import LLM_chat, SafeLLM
+
+
+# System prompt template, resolved from the repository root
+SYSTEM_PROMPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "prompts",
+    "universal_system_prompt.txt"
+)
+
+# Most recent messages sent to the LLM; older turns are already reflected
+# in the stored memories included in the system prompt
+MAX_HISTORY_MESSAGES = 40
 
 
 class RouteIntent(BaseModel):
@@ -74,7 +89,7 @@ class RouteIntent(BaseModel):
     )
 
 
-def main_assistant(state: MessagesState, config: RunnableConfig, store: BaseStore):
+async def main_assistant(state: MessagesState, config: RunnableConfig, store: BaseStore):
     """
     Main conversational assistant node.
     
@@ -93,25 +108,23 @@ def main_assistant(state: MessagesState, config: RunnableConfig, store: BaseStor
         Updated state with assistant response
     """
     
+    messages = state["messages"]
+    
     # Find the last HumanMessage to determine current turn
-    last_human_idx = -1
-    for i in range(len(state["messages"]) - 1, -1, -1):
-        msg = state["messages"][i]
-        if hasattr(msg, 'type') and msg.type == "human":
-            last_human_idx = i
-            break
-    
-    # Count how many AI messages with RouteIntent since last human message
-    route_count_this_turn = 0
-    if last_human_idx >= 0:
-        for msg in state["messages"][last_human_idx:]:
-            if hasattr(msg, 'type') and msg.type == "ai":
-                if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                    if any(tc.get("name") == "RouteIntent" for tc in msg.tool_calls):
-                        route_count_this_turn += 1
-    
-    # Should route only on first pass (when route_count_this_turn == 0)
-    should_route = route_count_this_turn == 0
+    last_human_idx = next(
+        (i for i in range(len(messages) - 1, -1, -1)
+         if getattr(messages[i], 'type', None) == "human"),
+        -1
+    )
+    
+    # Route only on the first pass: stop at the first RouteIntent since the
+    # last human message, scanning newest first
+    should_route = last_human_idx < 0 or not any(
+        tc.get("name") == "RouteIntent"
+        for msg in reversed(messages[last_human_idx:])
+        if getattr(msg, 'type', None) == "ai"
+        for tc in getattr(msg, 'tool_calls', None) or ()
+    )
     
     # Extract configuration
     configurable = Configuration.from_runnable_config(config)
@@ -122,55 +135,58 @@ def main_assistant(state: MessagesState, config: RunnableConfig, store: BaseStor
     enabled_memory_types = configurable.enabled_memory_types
     router_intents = configurable.router_intents
     
-    # Load memories for each enabled type
-    memory_content_parts = []
+    # Load memories for every enabled type in one batched store call.
+    # Reads are cached per user turn, so the response pass only re-reads
+    # namespaces that were written since the routing pass.
+    turn_id = messages[last_human_idx].id if last_human_idx >= 0 else None
+    all_memories = await aget_memories_by_types(
+        store, enabled_memory_types, assistant_type, user_id, turn_id
+    )
+    
+    # (tag, body) pairs and description lines, rendered with one join each
+    memory_sections = []
     memory_descriptions = []
     
-    for memory_type in enabled_memory_types:
-        memories = get_all_memories_by_type(store, memory_type, assistant_type, user_id)
-        
+    for memory_type, memories in zip(enabled_memory_types, all_memories):
+
         if memory_type == "profile":
             memory_descriptions.append("- User Profile (general information about the user)")
-            if memories:
-                memory_content_parts.append(
-                    f"<user_profile>\n{memories[0].value}\n</user_profile>"
-                )
-            else:
-                memory_content_parts.append(
-                    "<user_profile>\nNo profile information yet.\n</user_profile>"
-                )
+            memory_sections.append((
+                "user_profile",
+                memories[0].value if memories else "No profile information yet."
+            ))
         
         elif memory_type.startswith("finance_"):
             display_name = memory_type.replace("finance_", "").replace("_", " ").title()
             memory_descriptions.append(f"- {display_name}")
-            
-            if memories:
-                formatted = format_memories(memories)
-                memory_content_parts.append(
-                    f"<{memory_type}>\n{formatted}\n</{memory_type}>"
-                )
-            else:
-                memory_content_parts.append(
-                    f"<{memory_type}>\nNo {display_name.lower()} recorded yet.\n</{memory_type}>"
-                )
-    
-    # Load system prompt template
+            memory_sections.append((
+                memory_type,
+                format_memories(memories) if memories
+                else f"No {display_name.lower()} recorded yet."
+            ))
+    
+    # Load system prompt template (cached until the file changes)
     try:
-        with open("prompts/universal_system_prompt.txt", "r") as f:
-            system_prompt_template = f.read()
+        system_prompt_template = _load_prompt(
+            SYSTEM_PROMPT_PATH, os.path.getmtime(SYSTEM_PROMPT_PATH)
+        )
     except FileNotFoundError:
         # Fallback if file not found
         system_prompt_template = "{role_prompt}\n\n{memory_content}\n\nAvailable intents: {available_intents}"
     
+    current_time = datetime.now().isoformat()
+    
     # Format system prompt
     if should_route:
         # First pass - include routing instructions
         system_msg = system_prompt_template.format(
             role_prompt=role_prompt,
             memory_descriptions="\n".join(memory_descriptions),
-            memory_content="\n\n".join(memory_content_parts),
+            memory_content="\n\n".join(
+                f"<{tag}>\n{body}\n</{tag}>" for tag, body in memory_sections
+            ),
             available_intents=", ".join(router_intents),
-            current_time=datetime.now().isoformat()
+            current_time=current_time
         )
     else:
         # Second pass - after action completed, provide confirmation response
@@ -205,23 +221,94 @@ DO NOT:
 The calculations are done by Python and are 100% accurate.
 Your role is PRESENTATION ONLY.
 
-Current Date/Time: {datetime.now().isoformat()}"""
+Current Date/Time: {current_time}"""
     
     # Create model - only bind RouteIntent tool if we should route
     if should_route:
-        model = LLM_chat.bind_tools([RouteIntent], parallel_tool_calls=False)
+        model = _get_routing_llm()
     else:
         # Don't bind tools - just respond conversationally
-        # Create a fresh instance without any tool bindings
-        from safe_llm import SafeLLM
-        model = SafeLLM(temperature=0)  # Fresh instance, no tools
+        model = _get_no_tools_llm()
     
-    # Generate response
-    response = model.invoke([SystemMessage(content=system_msg)] + state["messages"])
+    # Only send a recent window of the conversation, starting on a user turn
+    # so tool calls stay paired with their results
+    history = trim_messages(
+        messages,
+        max_tokens=MAX_HISTORY_MESSAGES,
+        token_counter=len,
+        strategy="last",
+        start_on="human"
+    )
+    
+    # Generate response; the conversational pass streams its reply as
+    # custom stream events for callers using stream_mode="custom"
+    prompt = [SystemMessage(content=system_msg)] + history
+    writer = get_stream_writer()
+    if should_route:
+        response = await model.ainvoke(prompt)
+        streamed = False
+    else:
+        response = await _astream_reply(model, prompt, writer)
+        streamed = True
     
     # Ensure response has content
     if not response.content or len(response.content.strip()) == 0:
         # Fallback response if model returns empty
         response.content = "I've processed your request. How else can I help you with your finances?"
+        streamed = False
     
-    return {"messages": [response]}
\ No newline at end of file
+    # Record the routing decision so the graph's edge check is a single lookup
+    has_route_intent = any(
+        tc.get("name") == "RouteIntent"
+        for tc in getattr(response, "tool_calls", None) or []
+    )
+    response.additional_kwargs["_route"] = "router" if has_route_intent else END
+    
+    # Final replies that weren't streamed go out as a single event
+    if not has_route_intent and not streamed:
+        writer({"delta": response.content})
+    
+    return {"messages": [response]}
+
+
+async def _astream_reply(model: SafeLLM, messages: list, writer) -> AIMessage:
+    """
+    Stream a reply, writing each content delta to the graph's custom stream.
+    
+    The Groq client is synchronous, so chunks are pulled from a worker
+    thread one at a time to keep the event loop free.
+    
+    Returns:
+        The complete reply as a single AIMessage
+    """
+    chunks = model.stream(messages)
+    parts = []
+    while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+        if chunk.content:
+            parts.append(chunk.content)
+            writer({"delta": chunk.content})
+    return AIMessage(content="".join(parts))
+
+
+@lru_cache(maxsize=8)
+def _load_prompt(path: str, mtime: float) -> str:
+    """
+    Read a prompt file.
+    
+    Cached on (path, mtime), so edits to the file are picked up on the
+    next call while unchanged prompts are never re-read.
+    """
+    with open(path, "r") as f:
+        return f.read()
+
+
+@lru_cache(maxsize=1)
+def _get_routing_llm() -> SafeLLM:
+    """Shared LLM with only the RouteIntent tool bound."""
+    return LLM_chat.bind_tools([RouteIntent], parallel_tool_calls=False)
+
+
+@lru_cache(maxsize=1)
+def _get_no_tools_llm() -> SafeLLM:
+    """Shared LLM without tool bindings, created on first use."""
+    return SafeLLM(temperature=0)
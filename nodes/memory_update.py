@@ -5,35 +5,72 @@ This node handles automatic extraction and updating of memories
 based on conversation context, using Trustcall for structured extraction.
 """
 
+import re
 import uuid
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 from langchain_core.messages import SystemMessage, merge_message_runs
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import MessagesState
-from langgraph.store.base import BaseStore
+from langgraph.store.base import BaseStore, PutOp
 
 from trustcall import create_extractor
 
 from configuration import Configuration
-from utils.schema_registry import get_schema_for_memory_type, get_schema_name
+from utils.schema_registry import get_schema_bundle
 from utils.formatting import Spy, extract_tool_info
+from utils.store_utils import invalidate_memory_cache, search_namespace
+from utils.routing import find_last_route_intent
 
 # Import the custom LLM wrapper
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from safe_llm import LLM_chat
+from safe_llm import SafeLLM
 
 
-# Trustcall instruction template
+# Trustcall instruction (static, so the prompt prefix is identical across calls)
 TRUSTCALL_INSTRUCTION = """Reflect on the following interaction. 
 
 Use the provided tools to retain any necessary memories about the user.
 
-Use parallel tool calling to handle updates and insertions simultaneously.
+Use parallel tool calling to handle updates and insertions simultaneously."""
 
-System Time: {time}"""
+# Pleasantries and greetings that never carry profile information
+# (compared lowercased, without punctuation). Yes/no answers are not
+# listed: they can answer the assistant's own profile questions.
+_ACKNOWLEDGMENTS = frozenset({
+    "ok", "okay", "k", "thanks", "thank you", "thx", "ty", "cool", "great",
+    "nice", "got it", "sounds good", "perfect", "alright", "done",
+    "hi", "hello", "hey", "bye"
+})
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Appended after the conversation; rounded to the hour so repeated
+# extractions within the hour still send identical requests
+TRUSTCALL_TIME_TEMPLATE = "System Time: {time}"
+
+
+@lru_cache(maxsize=1)
+def _get_extractor_llm() -> SafeLLM:
+    """
+    Shared LLM for Trustcall extractors, created on first use.
+    
+    Trustcall binds its tools without a parallel_tool_calls flag, so the
+    instance itself allows parallel calls; the prompt asks for updates and
+    insertions in one response. Extractions repeat with identical inputs
+    while the conversation and stored memories are unchanged, so their
+    responses are cached.
+    """
+    return SafeLLM(parallel_tool_calls=True, cache_responses=True)
+
+
+@lru_cache(maxsize=1)
+def _get_fallback_llm() -> SafeLLM:
+    """Shared LLM for direct extraction, with response caching."""
+    return SafeLLM(cache_responses=True)
 
 
 def memory_update(state: MessagesState, config: RunnableConfig, store: BaseStore):
@@ -65,66 +102,132 @@ def memory_update(state: MessagesState, config: RunnableConfig, store: BaseStore
     # Track what we've updated to avoid duplicates
     updated_types = set()
     
-    # Always update profile if enabled (but only once)
-    if "profile" in enabled_memory_types and "profile" not in updated_types:
-        _update_memory_type(
-            state=state,
-            store=store,
-            memory_type="profile",
-            assistant_type=assistant_type,
-            user_id=user_id,
-            enable_inserts=False  # Profile is typically patch-only
+    # (memory_type, enable_inserts) extractions to run this turn
+    tasks = []
+    
+    # Shared by every memory type's extraction this turn: the instruction
+    # plus the conversation so far, merged once, then the current time
+    system_time = datetime.now().replace(minute=0, second=0, microsecond=0).isoformat()
+    merged_messages = list(
+        merge_message_runs(
+            messages=[SystemMessage(content=TRUSTCALL_INSTRUCTION)] + state["messages"][:-1]
         )
+    )
+    merged_messages.append(
+        SystemMessage(content=TRUSTCALL_TIME_TEMPLATE.format(time=system_time))
+    )
+    
+    # Update profile if enabled (but only once), unless the user's message
+    # can't carry new profile information
+    if (
+        "profile" in enabled_memory_types
+        and "profile" not in updated_types
+        and _should_update_profile(state["messages"])
+    ):
+        tasks.append(("profile", False))  # Profile is typically patch-only
         updated_types.add("profile")
     
-    # Find the most recent AI message with tool calls to determine intent
-    route_intent_message = None
-    for msg in reversed(state["messages"]):
-        if hasattr(msg, 'tool_calls') and msg.tool_calls:
-            # Check if it's a RouteIntent call
-            for tc in msg.tool_calls:
-                if tc.get("name") == "RouteIntent":
-                    route_intent_message = msg
-                    break
-        if route_intent_message:
-            break
+    # Find the most recent RouteIntent call to determine intent
+    route_intent_call = find_last_route_intent(state["messages"])
     
     # If we found a RouteIntent, determine what memories to update
-    if route_intent_message:
-        tool_call = route_intent_message.tool_calls[0]
+    if route_intent_call:
+        intent = route_intent_call.get("args", {}).get("intent", "other")
         
-        # If it's a RouteIntent, extract the intent
-        if tool_call.get("name") == "RouteIntent":
-            intent = tool_call.get("args", {}).get("intent", "other")
-            
-            # Map intent to memory types that might need updating
-            memory_updates_needed = _get_memory_types_for_intent(intent, enabled_memory_types)
-            
-            for memory_type in memory_updates_needed:
-                # Only update if we haven't already
-                if memory_type not in updated_types:
-                    _update_memory_type(
-                        state=state,
-                        store=store,
-                        memory_type=memory_type,
-                        assistant_type=assistant_type,
-                        user_id=user_id,
-                        enable_inserts=True
-                    )
-                    updated_types.add(memory_type)
+        # Map intent to memory types that might need updating
+        memory_updates_needed = _get_memory_types_for_intent(intent, enabled_memory_types)
+        
+        for memory_type in memory_updates_needed:
+            # Only update if we haven't already
+            if memory_type not in updated_types:
+                tasks.append((memory_type, True))
+                updated_types.add(memory_type)
+    
+    # Each extraction is an independent LLM round-trip, so run them
+    # concurrently; writes are only collected here and applied below
+    pending_writes = []
+    if len(tasks) == 1:
+        memory_type, enable_inserts = tasks[0]
+        pending_writes += _update_memory_type(
+            state=state,
+            store=store,
+            memory_type=memory_type,
+            assistant_type=assistant_type,
+            user_id=user_id,
+            merged_messages=merged_messages,
+            enable_inserts=enable_inserts,
+            max_existing=configurable.max_existing_memories,
+            config=config
+        )
+    elif tasks:
+        with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+            futures = [
+                pool.submit(
+                    _update_memory_type,
+                    state=state,
+                    store=store,
+                    memory_type=memory_type,
+                    assistant_type=assistant_type,
+                    user_id=user_id,
+                    merged_messages=merged_messages,
+                    enable_inserts=enable_inserts,
+                    max_existing=configurable.max_existing_memories,
+                    config=config
+                )
+                for memory_type, enable_inserts in tasks
+            ]
+            for future in as_completed(futures):
+                pending_writes += future.result()
+    
+    # One store round-trip for everything extracted this turn
+    if pending_writes:
+        store.batch(pending_writes)
+        for namespace in {op.namespace for op in pending_writes}:
+            invalidate_memory_cache(store, namespace)
     
     # Return empty state update (memories are saved in store, not state)
     return {"messages": []}
 
 
+def _should_update_profile(messages: list) -> bool:
+    """
+    Cheap gate for the per-turn profile extraction.
+    
+    Skips the LLM call only when the latest user message is a bare
+    acknowledgment or repeats the previous user message word for word;
+    anything else (including short statements like "I'm Sam") fails open.
+    """
+    user_texts = []
+    for msg in reversed(messages):
+        if getattr(msg, "type", None) == "human" and isinstance(msg.content, str):
+            user_texts.append(msg.content)
+            if len(user_texts) == 2:
+                break
+    
+    if not user_texts:
+        return True
+    
+    words = _WORD_RE.findall(user_texts[0].lower())
+    if not words or " ".join(words) in _ACKNOWLEDGMENTS:
+        return False
+    
+    if len(user_texts) == 2 and words == _WORD_RE.findall(user_texts[1].lower()):
+        return False
+    
+    return True
+
+
 def _update_memory_type(
     state: MessagesState,
     store: BaseStore,
     memory_type: str,
     assistant_type: str,
     user_id: str,
-    enable_inserts: bool = True
-):
+    merged_messages: list,
+    enable_inserts: bool = True,
+    max_existing: int = 50,
+    config: RunnableConfig = None
+) -> list[PutOp]:
     """
     Update a specific memory type using Trustcall (with fallback).
     
@@ -134,37 +237,40 @@ def _update_memory_type(
         memory_type: Type of memory to update
         assistant_type: Assistant type
         user_id: User identifier
+        merged_messages: Trustcall instruction plus conversation, already merged
         enable_inserts: Whether to allow new memory creation
+        max_existing: Maximum number of stored memories to show the extractor
+        config: Run configuration, passed explicitly because worker threads
+            don't inherit it (it scopes the extractor's response cache)
+        
+    Returns:
+        Store writes for the extracted memories (not yet applied)
     """
     
     # Get the schema for this memory type
-    schema = get_schema_for_memory_type(assistant_type, memory_type)
-    if not schema:
-        return
+    bundle = get_schema_bundle(assistant_type, memory_type)
+    if not bundle:
+        return []
     
-    schema_name = get_schema_name(schema)
+    schema, schema_name = bundle
     
     # Define namespace
     namespace = (memory_type, assistant_type, user_id)
     
-    # Retrieve existing memories
-    existing_items = store.search(namespace)
+    # Retrieve existing memories: the most recently updated ones, oldest
+    # first. Sorting ourselves keeps the set and its order the same on
+    # every store backend, whatever order its search returns
+    existing_items = sorted(
+        search_namespace(store, namespace),
+        key=lambda item: (item.updated_at, item.key)
+    )
+    existing_items = existing_items[-max_existing:] if max_existing > 0 else []
     existing_memories = (
         [(item.key, schema_name, item.value) for item in existing_items]
         if existing_items
         else None
     )
     
-    # Format instruction
-    instruction = TRUSTCALL_INSTRUCTION.format(time=datetime.now().isoformat())
-    
-    # Merge messages
-    updated_messages = list(
-        merge_message_runs(
-            messages=[SystemMessage(content=instruction)] + state["messages"][:-1]
-        )
-    )
-    
     # Try Trustcall first, fall back to direct extraction if it fails
     try:
         # Create spy for tracking
@@ -172,7 +278,7 @@ def _update_memory_type(
         
         # Create extractor
         extractor = create_extractor(
-            LLM_chat,
+            _get_extractor_llm(),
             tools=[schema],
             tool_choice=schema_name,
             enable_inserts=enable_inserts
@@ -186,17 +292,19 @@ def _update_memory_type(
         
         # Invoke extractor
         result = extractor.invoke({
-            "messages": updated_messages,
+            "messages": merged_messages,
             "existing": existing_memories
-        })
+        }, config)
         
-        # Save memories to store
-        for r, rmeta in zip(result["responses"], result["response_metadata"]):
-            store.put(
+        # Queue memories for the store
+        return [
+            PutOp(
                 namespace,
                 rmeta.get("json_doc_id", str(uuid.uuid4())),
                 r.model_dump(mode="json")
             )
+            for r, rmeta in zip(result["responses"], result["response_metadata"])
+        ]
             
     except Exception as e:
         # Trustcall failed, use direct extraction as fallback
@@ -204,11 +312,12 @@ def _update_memory_type(
         print(f"⚠️  Trustcall error for {memory_type}, using direct extraction: {error_msg[:100]}")
         
         try:
-            _direct_extraction_fallback(
-                state, store, schema, schema_name, namespace, updated_messages, enable_inserts
+            return _direct_extraction_fallback(
+                state, store, schema, schema_name, namespace, merged_messages, enable_inserts, config
             )
         except Exception as fallback_error:
             print(f"⚠️  Direct extraction also failed for {memory_type}: {fallback_error}")
+            return []
 
 
 def _direct_extraction_fallback(
@@ -218,15 +327,17 @@ def _direct_extraction_fallback(
     schema_name: str,
     namespace: tuple,
     messages: list,
-    enable_inserts: bool
-):
+    enable_inserts: bool,
+    config: RunnableConfig = None
+) -> list[PutOp]:
     """
     Fallback method that uses the LLM directly to extract structured data.
     
     This is used when Trustcall has compatibility issues.
+    Returns the store writes for the caller to batch.
     """
     # Create a model bound with the schema as a tool
-    model = LLM_chat.bind_tools([schema], tool_choice=schema_name)
+    model = _get_fallback_llm().bind_tools([schema], tool_choice=schema_name)
     
     # Add extraction prompt
     extraction_prompt = f"""Extract {schema_name} information from the conversation.
@@ -238,7 +349,9 @@ Be thorough and capture all relevant details."""
     extraction_messages = messages + [SystemMessage(content=extraction_prompt)]
     
     # Invoke the model
-    response = model.invoke(extraction_messages)
+    response = model.invoke(extraction_messages, config)
+    
+    writes = []
     
     # Check if we got tool calls
     if response.tool_calls:
@@ -249,18 +362,20 @@ Be thorough and capture all relevant details."""
                 
                 # Validate with Pydantic
                 try:
-                    validated = schema(**data)
+                    validated = schema.model_validate(data)
                     
-                    # Save to store
-                    store.put(
+                    # Queue for the store
+                    writes.append(PutOp(
                         namespace,
                         str(uuid.uuid4()),
                         validated.model_dump(mode="json")
-                    )
+                    ))
                     print(f"✅ Successfully extracted {schema_name} via direct method")
                     
                 except Exception as validation_error:
                     print(f"⚠️  Validation error: {validation_error}")
+    
+    return writes
 
 
 def _get_memory_types_for_intent(intent: str, enabled_memory_types: list[str]) -> list[str]:
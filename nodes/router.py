@@ -10,6 +10,7 @@ from langgraph.graph import MessagesState
 
 from configuration import Configuration
 from utils.intent_registry import get_executor_for_intent
+from utils.routing import find_last_route_intent
 
 
 def router(state: MessagesState, config: RunnableConfig):
@@ -50,15 +51,7 @@ def route_to_executor(state: MessagesState, config: RunnableConfig):
     assistant_type = configurable.assistant_type
     
     # Find the most recent AI message with RouteIntent tool call
-    route_intent_call = None
-    for msg in reversed(state["messages"]):
-        if hasattr(msg, 'tool_calls') and msg.tool_calls:
-            for tc in msg.tool_calls:
-                if tc.get("name") == "RouteIntent":
-                    route_intent_call = tc
-                    break
-        if route_intent_call:
-            break
+    route_intent_call = find_last_route_intent(state["messages"])
     
     # If no RouteIntent found, go to memory_update
     if not route_intent_call:
@@ -1,15 +1,253 @@
 
 
 import os
+import asyncio
+import atexit
+import contextvars
+import copy
+import hashlib
+import io
+import queue
+import threading
+import time
+from collections import OrderedDict
+import inspect
+from functools import lru_cache
 from dotenv import load_dotenv
-from groq import Groq
+from groq import Groq, DefaultHttpxClient
+import httpx
 import uuid
-import json
 from datetime import datetime, timezone
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolCall, ToolCallChunk
+from langchain_core.runnables.config import ensure_config
+from pydantic import BaseModel
+
+from utils import json_utils
 
 # Load environment variables
 load_dotenv()
 
+# HTTP/2 multiplexing is used when the optional h2 package is installed
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# One Groq client per API key, shared by every SafeLLM instance
+_GROQ_CLIENTS = {}
+
+
+def _get_groq_client(api_key):
+    """
+    Get the shared Groq client for an API key.
+    
+    All SafeLLM instances reuse the same pooled HTTP client, so kept-alive
+    connections survive across calls and instances instead of paying a new
+    TLS handshake each time.
+    
+    Args:
+        api_key: Groq API key
+        
+    Returns:
+        Groq client
+    """
+    client = _GROQ_CLIENTS.get(api_key)
+    if client is None:
+        client = Groq(
+            api_key=api_key,
+            http_client=DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    # Keep connections across the pause between conversation turns
+                    keepalive_expiry=60.0
+                ),
+                http2=_HTTP2_AVAILABLE
+            )
+        )
+        _GROQ_CLIENTS[api_key] = client
+    return client
+
+
+@atexit.register
+def close_groq_clients():
+    """
+    Close the shared Groq clients and their connection pools.
+    
+    Registered to run at interpreter exit so kept-alive connections are
+    released cleanly.
+    """
+    while _GROQ_CLIENTS:
+        _, client = _GROQ_CLIENTS.popitem()
+        client.close()
+
+
+# Re-entrancy guard for SafeLLM.invoke. Context-local, so concurrent calls
+# from worker threads or tasks never see each other's depth
+_INVOKE_DEPTH = contextvars.ContextVar("safe_llm_invoke_depth", default=0)
+
+
+# LangSmith calls are sent from a background thread so tracing never
+# blocks an LLM call; when the queue is full, traces are dropped
+_TRACE_QUEUE = queue.Queue(maxsize=1024)
+_TRACE_WORKER = None
+_TRACE_WORKER_LOCK = threading.Lock()
+
+
+def _trace_worker():
+    """Send queued LangSmith calls in order until the exit sentinel."""
+    while True:
+        item = _TRACE_QUEUE.get()
+        if item is None:
+            return
+        client, method, kwargs = item
+        try:
+            getattr(client, method)(**kwargs)
+        except Exception as e:
+            print(f"[LangSmith] {method} failed: {e}")
+
+
+def _submit_trace(client, method, **kwargs):
+    """Queue a LangSmith client call (create_run/update_run)."""
+    global _TRACE_WORKER
+    if _TRACE_WORKER is None:
+        with _TRACE_WORKER_LOCK:
+            if _TRACE_WORKER is None:
+                _TRACE_WORKER = threading.Thread(
+                    target=_trace_worker, name="langsmith-trace", daemon=True
+                )
+                _TRACE_WORKER.start()
+    try:
+        _TRACE_QUEUE.put_nowait((client, method, kwargs))
+    except queue.Full:
+        pass
+
+
+@atexit.register
+def _flush_traces():
+    """Give queued traces a moment to be sent at interpreter exit."""
+    if _TRACE_WORKER is not None:
+        try:
+            _TRACE_QUEUE.put(None, timeout=1.0)
+        except queue.Full:
+            return
+        _TRACE_WORKER.join(timeout=5.0)
+
+
+# Exact-match response cache for deterministic (temperature 0) calls on
+# LLMs created with cache_responses=True: request hash -> (expiry, AIMessage)
+_RESPONSE_CACHE = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+_RESPONSE_CACHE_MAX = 512
+_RESPONSE_CACHE_TTL = 300.0
+
+
+def _response_cache_key(request_params, config):
+    """
+    Stable hash of a Groq request (model, temperature, messages, tools),
+    scoped to the thread and user of the calling run.
+    """
+    configurable = ensure_config(config).get("configurable", {})
+    scope = (configurable.get("thread_id"), configurable.get("user_id"))
+    payload = json_utils.dumps([scope, request_params], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _response_cache_get(key):
+    """Return a copy of a cached response, or None on miss/expiry."""
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(key)
+        if entry is None:
+            return None
+        expiry, message = entry
+        if expiry < time.monotonic():
+            del _RESPONSE_CACHE[key]
+            return None
+        _RESPONSE_CACHE.move_to_end(key)
+    # Callers mutate responses (content, additional_kwargs), so never share
+    # them; tool call ids must be unique per response, so mint fresh ones
+    message = message.model_copy(deep=True)
+    for tool_call in message.tool_calls:
+        tool_call["id"] = f"call_{uuid.uuid4().hex}"
+    return message
+
+
+def _response_cache_put(key, message):
+    """Store a copy of a response, evicting the least recently used entry."""
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = (time.monotonic() + _RESPONSE_CACHE_TTL, message.model_copy(deep=True))
+        _RESPONSE_CACHE.move_to_end(key)
+        if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAX:
+            _RESPONSE_CACHE.popitem(last=False)
+
+
+@lru_cache(maxsize=64)
+def _format_pydantic_tool(tool):
+    """
+    Groq tool definition for a Pydantic model, built once per model class.
+    """
+    schema = tool.model_json_schema()
+    return {
+        "type": "function",
+        "function": {
+            "name": tool.__name__,
+            "description": schema.get("description", f"Tool: {tool.__name__}"),
+            "parameters": {
+                "type": "object",
+                "properties": schema.get("properties", {}),
+                "required": schema.get("required", [])
+            }
+        }
+    }
+
+
+def _format_system_message(msg):
+    return {"role": "system", "content": msg.content}
+
+
+def _format_human_message(msg):
+    return {"role": "user", "content": msg.content}
+
+
+def _format_ai_tool_calls(tool_calls):
+    return [
+        {
+            "id": tc.get("id", f"call_{i}"),
+            "type": "function",
+            "function": {
+                "name": tc.get("name"),
+                "arguments": json_utils.dumps(tc.get("args", {}))
+            }
+        }
+        for i, tc in enumerate(tool_calls)
+    ]
+
+
+def _format_ai_message(msg):
+    msg_dict = {"role": "assistant", "content": msg.content or ""}
+    tool_calls = getattr(msg, 'tool_calls', None)
+    if tool_calls:
+        msg_dict["tool_calls"] = _format_ai_tool_calls(tool_calls)
+    return msg_dict
+
+
+def _format_tool_message(msg):
+    return {
+        "role": "tool",
+        "content": msg.content,
+        "tool_call_id": msg.tool_call_id
+    }
+
+
+# LangChain message type -> Groq message dict; other types are dropped
+_MESSAGE_FORMATTERS = {
+    "system": _format_system_message,
+    "human": _format_human_message,
+    "ai": _format_ai_message,
+    "tool": _format_tool_message,
+}
+
 
 class SafeLLM:
     """
@@ -19,27 +257,39 @@ class SafeLLM:
     for faster, more efficient inference with open-source models.
     """
     
-    def __init__(self, model_name="openai/gpt-oss-120b", temperature=0):
+    def __init__(
+        self,
+        model_name="openai/gpt-oss-120b",
+        temperature=0,
+        parallel_tool_calls=False,
+        cache_responses=False
+    ):
         """
         Initialize SafeLLM with Groq client.
         
         Args:
             model_name: Groq model to use
             temperature: Temperature for sampling (0-1)
+            parallel_tool_calls: Default for tool bindings that don't set it
+                (e.g. the ones Trustcall creates)
+            cache_responses: Answer repeated identical temperature-0
+                requests from the in-process response cache
         """
         self.model_name = model_name
         self.temperature = temperature
+        self.cache_responses = cache_responses
         
         # Verify Groq API key
         groq_key = os.getenv("GROQ_API_KEY")
         if not groq_key:
             raise ValueError("❌ GROQ_API_KEY not found in environment variables!")
         
-        self.client = Groq(api_key=groq_key)
+        self.client = _get_groq_client(groq_key)
         self.tools = []
-        self.parallel_tool_calls = False
+        self.parallel_tool_calls = parallel_tool_calls
         self.tool_choice = None
-        self._invoke_stack = 0
+        self._tools_cache_key = None
+        self._formatted_tools_cache = None
         
         # LangSmith setup
         self.langsmith_tracing = os.getenv("LANGSMITH_TRACING_V2", "false").lower() == "true"
@@ -85,10 +335,11 @@ class SafeLLM:
         Returns:
             AIMessage with response
         """
-        if self._invoke_stack > 0:
+        depth = _INVOKE_DEPTH.get()
+        if depth > 0:
             return messages[-1] if isinstance(messages, list) else messages
         
-        self._invoke_stack += 1
+        depth_token = _INVOKE_DEPTH.set(depth + 1)
         run_id = None
         
         try:
@@ -102,6 +353,7 @@ class SafeLLM:
             
             if self.tools:
                 request_params["tools"] = self._format_tools()
+                request_params["parallel_tool_calls"] = self.parallel_tool_calls
                 
                 # Handle tool_choice
                 if self.tool_choice:
@@ -119,41 +371,44 @@ class SafeLLM:
                 else:
                     request_params["tool_choice"] = "auto"
             
-            # Start trace in LangSmith
+            # Identical deterministic requests (e.g. repeated extractions)
+            # are answered from the cache without a round-trip
+            cache_key = None
+            if self.cache_responses and self.temperature == 0:
+                cache_key = _response_cache_key(request_params, config)
+                cached = _response_cache_get(cache_key)
+                if cached is not None:
+                    return cached
+            
+            # Start trace in LangSmith (queued, sent in the background)
             if self.langsmith_tracing and self.langsmith_client:
-                try:
-                    run_id = str(uuid.uuid4())
-                    
-                    self.langsmith_client.create_run(
-                        id=run_id,
-                        name="groq_llm_call",
-                        run_type="llm",
-                        inputs={
-                            "messages": formatted_messages,
-                            "model": self.model_name,
-                            "temperature": self.temperature
-                        },
-                        project_name=self.langsmith_project,
-                        start_time=datetime.now(timezone.utc)
-                    )
-                    
-                except Exception as e:
-                    print(f"[LangSmith] Create run failed: {e}")
-                    run_id = None
+                run_id = str(uuid.uuid4())
+                _submit_trace(
+                    self.langsmith_client,
+                    "create_run",
+                    id=run_id,
+                    name="groq_llm_call",
+                    run_type="llm",
+                    inputs={
+                        "messages": formatted_messages,
+                        "model": self.model_name,
+                        "temperature": self.temperature
+                    },
+                    project_name=self.langsmith_project,
+                    start_time=datetime.now(timezone.utc)
+                )
             
             # Call Groq API
             response = self.client.chat.completions.create(**request_params)
             message = response.choices[0].message
             
-            from langchain_core.messages import AIMessage, ToolCall
-            
             tool_calls = []
             if hasattr(message, 'tool_calls') and message.tool_calls:
                 for tc in message.tool_calls:
                     # Convert arguments from string to dict
                     try:
-                        args = json.loads(tc.function.arguments) if isinstance(tc.function.arguments, str) else tc.function.arguments
-                    except json.JSONDecodeError:
+                        args = json_utils.loads(tc.function.arguments) if isinstance(tc.function.arguments, str) else tc.function.arguments
+                    except ValueError:
                         args = {}
                     
                     tool_calls.append(ToolCall(
@@ -167,26 +422,42 @@ class SafeLLM:
                 tool_calls=tool_calls
             )
             
-            # End trace and save output
+            # End trace and save output (queued after the matching create_run)
             if self.langsmith_tracing and self.langsmith_client and run_id:
-                try:
-                    self.langsmith_client.update_run(
-                        run_id=run_id,
-                        outputs={
-                            "content": result.content,
-                            "model": self.model_name
-                        },
-                        end_time=datetime.now(timezone.utc)
-                    )
-                    print(f"✅ Run logged to LangSmith: {run_id[:8]}...")
-                    
-                except Exception as e:
-                    print(f"[LangSmith] Update run failed: {e}")
+                _submit_trace(
+                    self.langsmith_client,
+                    "update_run",
+                    run_id=run_id,
+                    outputs={
+                        "content": result.content,
+                        "model": self.model_name
+                    },
+                    end_time=datetime.now(timezone.utc)
+                )
+            
+            if cache_key is not None:
+                _response_cache_put(cache_key, result)
             
             return result
             
         finally:
-            self._invoke_stack -= 1
+            _INVOKE_DEPTH.reset(depth_token)
+
+    async def ainvoke(self, messages, config=None):
+        """
+        Asynchronously invoke the LLM with messages.
+        
+        The Groq client is synchronous, so the request runs in a worker
+        thread and the event loop stays free while it is in flight.
+        
+        Args:
+            messages: List of LangChain messages or single message
+            config: Optional RunnableConfig (for LangChain compatibility)
+            
+        Returns:
+            AIMessage with response
+        """
+        return await asyncio.to_thread(self.invoke, messages, config)
 
     def stream(self, messages, config=None):
         """
@@ -201,8 +472,6 @@ class SafeLLM:
         Yields:
             AIMessageChunk objects with partial content
         """
-        from langchain_core.messages import AIMessageChunk, ToolCall, ToolCallChunk
-        
         formatted_messages = self._format_messages(messages)
         
         request_params = {
@@ -214,6 +483,7 @@ class SafeLLM:
         
         if self.tools:
             request_params["tools"] = self._format_tools()
+            request_params["parallel_tool_calls"] = self.parallel_tool_calls
             
             # Handle tool_choice
             if self.tool_choice:
@@ -232,7 +502,8 @@ class SafeLLM:
         # Call Groq API with streaming
         stream = self.client.chat.completions.create(**request_params)
         
-        # Track tool calls being built
+        # Track tool calls being built; argument fragments are appended to a
+        # per-call buffer and parsed once when the stream ends
         tool_call_chunks = {}
         
         for chunk in stream:
@@ -249,33 +520,34 @@ class SafeLLM:
             if hasattr(delta, 'tool_calls') and delta.tool_calls:
                 for tc_delta in delta.tool_calls:
                     index = tc_delta.index
+                    tc_id = getattr(tc_delta, 'id', None)
+                    function = getattr(tc_delta, 'function', None)
+                    name = getattr(function, 'name', None)
+                    arguments = getattr(function, 'arguments', None)
                     
-                    # Initialize tool call if new
-                    if index not in tool_call_chunks:
-                        tool_call_chunks[index] = {
-                            'id': tc_delta.id if hasattr(tc_delta, 'id') else None,
+                    # Accumulate for the final complete tool calls
+                    acc = tool_call_chunks.get(index)
+                    if acc is None:
+                        acc = tool_call_chunks[index] = {
+                            'id': tc_id,
                             'name': '',
-                            'args': ''
+                            'args': io.StringIO()
                         }
+                    if tc_id:
+                        acc['id'] = tc_id
+                    if name:
+                        acc['name'] = name
+                    if arguments:
+                        acc['args'].write(arguments)
                     
-                    # Update tool call data
-                    if hasattr(tc_delta, 'id') and tc_delta.id:
-                        tool_call_chunks[index]['id'] = tc_delta.id
-                    
-                    if hasattr(tc_delta, 'function'):
-                        if hasattr(tc_delta.function, 'name') and tc_delta.function.name:
-                            tool_call_chunks[index]['name'] = tc_delta.function.name
-                        if hasattr(tc_delta.function, 'arguments') and tc_delta.function.arguments:
-                            tool_call_chunks[index]['args'] += tc_delta.function.arguments
-                    
-                    # Yield tool call chunk
+                    # Yield only this delta; chunk consumers merge by index
                     yield AIMessageChunk(
                         content="",
                         tool_call_chunks=[
                             ToolCallChunk(
-                                name=tool_call_chunks[index]['name'] or None,
-                                args=tc_delta.function.arguments if hasattr(tc_delta, 'function') and hasattr(tc_delta.function, 'arguments') else None,
-                                id=tool_call_chunks[index]['id'],
+                                name=name or None,
+                                args=arguments,
+                                id=tc_id,
                                 index=index
                             )
                         ]
@@ -286,9 +558,10 @@ class SafeLLM:
             complete_tool_calls = []
             for idx in sorted(tool_call_chunks.keys()):
                 tc = tool_call_chunks[idx]
+                raw_args = tc['args'].getvalue()
                 try:
-                    args = json.loads(tc['args']) if tc['args'] else {}
-                except json.JSONDecodeError:
+                    args = json_utils.loads(raw_args) if raw_args else {}
+                except ValueError:
                     args = {}
                 
                 complete_tool_calls.append(ToolCall(
@@ -314,34 +587,13 @@ class SafeLLM:
         """
         formatted = []
         for msg in messages:
-            if hasattr(msg, 'type'):
-                if msg.type == "system":
-                    formatted.append({"role": "system", "content": msg.content})
-                elif msg.type == "human":
-                    formatted.append({"role": "user", "content": msg.content})
-                elif msg.type == "ai":
-                    msg_dict = {"role": "assistant", "content": msg.content or ""}
-                    if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                        msg_dict["tool_calls"] = [
-                            {
-                                "id": tc.get("id", f"call_{i}"),
-                                "type": "function",
-                                "function": {
-                                    "name": tc.get("name"),
-                                    "arguments": json.dumps(tc.get("args", {}))
-                                }
-                            }
-                            for i, tc in enumerate(msg.tool_calls)
-                        ]
-                    formatted.append(msg_dict)
-                elif msg.type == "tool":
-                    formatted.append({
-                        "role": "tool",
-                        "content": msg.content,
-                        "tool_call_id": msg.tool_call_id
-                    })
-            else:
+            msg_type = getattr(msg, 'type', None)
+            if msg_type is None:
                 formatted.append(msg)
+                continue
+            formatter = _MESSAGE_FORMATTERS.get(msg_type)
+            if formatter is not None:
+                formatted.append(formatter(msg))
         return formatted
 
     def _format_tools(self):
@@ -353,27 +605,17 @@ class SafeLLM:
         Returns:
             List of tool dictionaries
         """
-        import inspect
-        from pydantic import BaseModel
+        # Tools only change through bind_tools, so reuse the last result
+        cache_key = tuple(id(tool) for tool in self.tools)
+        if cache_key == self._tools_cache_key:
+            return self._formatted_tools_cache
         
         formatted_tools = []
         
         for tool in self.tools:
             # Check if it's a Pydantic model
             if isinstance(tool, type) and issubclass(tool, BaseModel):
-                schema = tool.model_json_schema()
-                formatted_tools.append({
-                    "type": "function",
-                    "function": {
-                        "name": tool.__name__,
-                        "description": schema.get("description", f"Tool: {tool.__name__}"),
-                        "parameters": {
-                            "type": "object",
-                            "properties": schema.get("properties", {}),
-                            "required": schema.get("required", [])
-                        }
-                    }
-                })
+                formatted_tools.append(_format_pydantic_tool(tool))
             else:
                 # Assume it's a function
                 sig = inspect.signature(tool)
@@ -409,25 +651,36 @@ class SafeLLM:
                     }
                 })
         
+        self._tools_cache_key = cache_key
+        self._formatted_tools_cache = formatted_tools
         return formatted_tools
 
-    def bind_tools(self, tools, parallel_tool_calls=False, tool_choice=None, **kwargs):
+    def bind_tools(self, tools, parallel_tool_calls=None, tool_choice=None, **kwargs):
         """
-        Bind tools to this LLM instance.
+        Return a copy of this LLM with the given tools bound.
+        
+        The copy shares the underlying Groq client, so binding is cheap and
+        the instance it was called on (e.g. the shared ``LLM_chat``) keeps
+        its own tool configuration.
         
         Args:
             tools: List of tools (Pydantic models or functions)
             parallel_tool_calls: Whether to allow parallel tool calling
+                (None keeps this LLM's setting, False by default)
             tool_choice: Tool choice strategy (auto, required, or specific tool name)
             **kwargs: Additional arguments (ignored for compatibility)
             
         Returns:
-            Self for chaining
+            A new SafeLLM with the tools bound
         """
-        self.tools = tools
-        self.parallel_tool_calls = parallel_tool_calls
-        self.tool_choice = tool_choice
-        return self
+        bound = copy.copy(self)
+        bound.tools = tools
+        if parallel_tool_calls is not None:
+            bound.parallel_tool_calls = parallel_tool_calls
+        bound.tool_choice = tool_choice
+        bound._tools_cache_key = None
+        bound._formatted_tools_cache = None
+        return bound
 
     def with_config(self, config=None, **kwargs):
         """
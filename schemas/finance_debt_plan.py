@@ -3,12 +3,14 @@ Finance debt payoff plan schema for storing complete payment schedules.
 """
 
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class OneTimePayment(BaseModel):
     """One-time extra payment in a specific month."""
     
+    model_config = ConfigDict(frozen=True)
+    
     month: int = Field(
         description="Month number when payment is made (1, 2, 3...)",
         gt=0
@@ -26,6 +28,8 @@ class OneTimePayment(BaseModel):
 class MonthlyPaymentRow(BaseModel):
     """Single month in a debt payoff plan."""
     
+    model_config = ConfigDict(frozen=True)
+    
     month: int = Field(description="Month number (1, 2, 3...)")
     salary: float = Field(description="Monthly salary")
     fixed_expenses: float = Field(description="Fixed monthly expenses")
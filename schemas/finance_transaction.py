@@ -2,11 +2,28 @@
 Finance transaction schema for tracking income and expenses.
 """
 
+import time
 from typing import Literal, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 
 
+# Today's date string, reused until the next local midnight (epoch seconds)
+_today_str = ""
+_today_expires = 0.0
+
+
+def _today() -> str:
+    """Current local date as YYYY-MM-DD, formatted once per day."""
+    global _today_str, _today_expires
+    if time.time() >= _today_expires:
+        now = datetime.now()
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        _today_str = now.strftime("%Y-%m-%d")
+        _today_expires = midnight.timestamp()
+    return _today_str
+
+
 class FinanceTransaction(BaseModel):
     """
     Schema for financial transactions (income or expenses).
@@ -34,7 +51,7 @@ class FinanceTransaction(BaseModel):
     
     date: str = Field(
         description="Date and time of the transaction in YYYY-MM-DD format (e.g., '2025-02-14')",
-        default_factory=lambda: datetime.now().strftime("%Y-%m-%d")
+        default_factory=_today
     )
     
     payment_method: Optional[str] = Field(
@@ -7,7 +7,58 @@ This ensures the LLM never does calculations - it only formats
 pre-calculated data for presentation.
 """
 
-import json
+from pydantic import BaseModel
+
+from . import json_utils
+
+
+# Static sections of the markdown plan
+_OVERVIEW_TMPL = (
+    "## 📊 {plan_name}\n\n"
+    "**Plan Overview:**\n\n"
+    "- 💰 Monthly Salary: **{salary:,.0f} {currency}**\n"
+    "- 📌 Fixed Expenses: **{fixed_expenses:,.0f} {currency}**\n"
+    "- 💳 Initial Debt: **{initial_debt:,.0f} {currency}**\n"
+    "- 📈 Monthly Interest Rate: **{rate_pct:.2f}%**\n"
+    "- 💾 Savings Rate: **{savings_pct:.0f}%** of salary\n"
+    "- ⏱️ Plan Duration: **{months} months**\n\n"
+)
+_TABLE_HEADER = (
+    "### Monthly Breakdown\n\n"
+    "| Month | Salary | Fixed Exp | Savings | Regular Payment | Bonus/Extra | Total Payment | Interest | Balance |\n"
+    "|-------|--------|-----------|---------|-----------------|-------------|---------------|----------|----------|\n"
+)
+_SUMMARY_HEADER = "\n### 📊 Summary\n\n"
+_CLEARED_BANNER = "✅ **Debt Fully Cleared!**\n\n"
+_NOT_CLEARED_BANNER = "⚠️ **Debt Not Fully Cleared**\n\n"
+_RESULTS_HEADER = "\n**Financial Results:**\n\n"
+_FOOTER_RULE = "\n---\n"
+
+# Monthly breakdown table rows, filled from MonthlyPaymentRow dicts
+_ROW_TMPL_WITH_BONUS = (
+    "| {month} | {salary:,.0f} | {fixed_expenses:,.0f} | {savings_amount:,.0f} "
+    "| {debt_payment:,.0f} | {one_time_payment:,.0f} | **{total_payment:,.0f}** "
+    "| {interest_charged:.2f} | {remaining_balance:.2f} |\n"
+)
+_ROW_TMPL_NO_BONUS = (
+    "| {month} | {salary:,.0f} | {fixed_expenses:,.0f} | {savings_amount:,.0f} "
+    "| {debt_payment:,.0f} | — | **{total_payment:,.0f}** "
+    "| {interest_charged:.2f} | {remaining_balance:.2f} |\n"
+)
+
+
+def _coerce_plan(plan_json) -> dict:
+    """
+    Accept a plan as a dict, a FinanceDebtPlan model, or JSON text.
+    
+    Models are dumped directly, so callers holding a plan object never
+    pay for a JSON round-trip.
+    """
+    if isinstance(plan_json, dict):
+        return plan_json
+    if isinstance(plan_json, BaseModel):
+        return plan_json.model_dump()
+    return json_utils.loads(plan_json)
 
 
 def format_debt_plan_as_markdown(plan_json: dict) -> str:
@@ -19,87 +70,83 @@ def format_debt_plan_as_markdown(plan_json: dict) -> str:
     to display results without touching any numbers.
     
     Args:
-        plan_json: The plan dictionary from FinanceDebtPlan.model_dump()
+        plan_json: The plan dictionary from FinanceDebtPlan.model_dump(),
+            a FinanceDebtPlan, or its JSON text
         
     Returns:
         Markdown-formatted string with tables and summary
     """
     
-    plan = plan_json if isinstance(plan_json, dict) else json.loads(plan_json)
+    plan = _coerce_plan(plan_json)
     currency = "EGP"  # Could be extracted from plan if needed
     
-    # Header
-    output = f"## 📊 {plan['plan_name']}\n\n"
-    
-    # Overview
-    output += "**Plan Overview:**\n\n"
-    output += f"- 💰 Monthly Salary: **{plan['salary']:,.0f} {currency}**\n"
-    output += f"- 📌 Fixed Expenses: **{plan['fixed_expenses']:,.0f} {currency}**\n"
-    output += f"- 💳 Initial Debt: **{plan['initial_debt']:,.0f} {currency}**\n"
-    output += f"- 📈 Monthly Interest Rate: **{plan['monthly_interest_rate'] * 100:.2f}%**\n"
-    output += f"- 💾 Savings Rate: **{plan['savings_rate'] * 100:.0f}%** of salary\n"
-    output += f"- ⏱️ Plan Duration: **{plan['months']} months**\n\n"
+    # Header and overview
+    parts = [_OVERVIEW_TMPL.format(
+        plan_name=plan['plan_name'],
+        currency=currency,
+        salary=plan['salary'],
+        fixed_expenses=plan['fixed_expenses'],
+        initial_debt=plan['initial_debt'],
+        rate_pct=plan['monthly_interest_rate'] * 100,
+        savings_pct=plan['savings_rate'] * 100,
+        months=plan['months']
+    )]
     
     # One-time payments if any
     if plan.get('one_time_payments') and len(plan['one_time_payments']) > 0:
-        output += "**Scheduled Bonuses/Extra Payments:**\n\n"
+        parts.append("**Scheduled Bonuses/Extra Payments:**\n\n")
         for otp in plan['one_time_payments']:
             desc = otp.get('description', 'Extra payment')
-            output += f"- Month {otp['month']}: **{otp['amount']:,.0f} {currency}** ({desc})\n"
-        output += "\n"
+            parts.append(f"- Month {otp['month']}: **{otp['amount']:,.0f} {currency}** ({desc})\n")
+        parts.append("\n")
     
     # Month-by-month table
-    output += "### Monthly Breakdown\n\n"
-    output += "| Month | Salary | Fixed Exp | Savings | Regular Payment | Bonus/Extra | Total Payment | Interest | Balance |\n"
-    output += "|-------|--------|-----------|---------|-----------------|-------------|---------------|----------|----------|\n"
-    
-    for row in plan['monthly_rows']:
-        output += f"| {row['month']} "
-        output += f"| {row['salary']:,.0f} "
-        output += f"| {row['fixed_expenses']:,.0f} "
-        output += f"| {row['savings_amount']:,.0f} "
-        output += f"| {row['debt_payment']:,.0f} "
-        output += f"| {row['one_time_payment']:,.0f} " if row['one_time_payment'] > 0 else "| — "
-        output += f"| **{row['total_payment']:,.0f}** "
-        output += f"| {row['interest_charged']:.2f} "
-        output += f"| {row['remaining_balance']:.2f} |\n"
+    parts.append(_TABLE_HEADER)
+    
+    # format_map pulls every field in C; only the bonus check is a
+    # Python-level lookup per row
+    with_bonus, no_bonus = _ROW_TMPL_WITH_BONUS, _ROW_TMPL_NO_BONUS
+    parts.extend(
+        (with_bonus if row['one_time_payment'] > 0 else no_bonus).format_map(row)
+        for row in plan['monthly_rows']
+    )
     
     # Summary
-    output += "\n### 📊 Summary\n\n"
+    parts.append(_SUMMARY_HEADER)
     
     if plan['is_debt_cleared']:
-        output += f"✅ **Debt Fully Cleared!**\n\n"
+        parts.append(_CLEARED_BANNER)
         if plan.get('months_to_payoff'):
-            output += f"- 🎯 Paid off in: **{plan['months_to_payoff']} months** "
+            parts.append(f"- 🎯 Paid off in: **{plan['months_to_payoff']} months** ")
             if plan['months_to_payoff'] < plan['months']:
-                output += f"(ahead of {plan['months']}-month plan!)"
-            output += "\n"
+                parts.append(f"(ahead of {plan['months']}-month plan!)")
+            parts.append("\n")
     else:
-        output += f"⚠️ **Debt Not Fully Cleared**\n\n"
-        output += f"- Remaining balance: **{plan['final_balance']:,.2f} {currency}**\n"
+        parts.append(_NOT_CLEARED_BANNER)
+        parts.append(f"- Remaining balance: **{plan['final_balance']:,.2f} {currency}**\n")
         if plan.get('recommended_payment'):
-            output += f"- 💡 To clear in {plan['months']} months, increase payment to: **{plan['recommended_payment']:,.2f} {currency}/month**\n"
+            parts.append(f"- 💡 To clear in {plan['months']} months, increase payment to: **{plan['recommended_payment']:,.2f} {currency}/month**\n")
     
-    output += f"\n**Financial Results:**\n\n"
-    output += f"- 💰 Total Saved: **{plan['total_saved']:,.0f} {currency}**\n"
-    output += f"- 📈 Total Interest Paid: **{plan['total_interest_paid']:,.2f} {currency}**\n"
-    output += f"- 💳 Total Regular Payments: **{plan['total_regular_payments']:,.2f} {currency}**\n"
+    parts.append(_RESULTS_HEADER)
+    parts.append(f"- 💰 Total Saved: **{plan['total_saved']:,.0f} {currency}**\n")
+    parts.append(f"- 📈 Total Interest Paid: **{plan['total_interest_paid']:,.2f} {currency}**\n")
+    parts.append(f"- 💳 Total Regular Payments: **{plan['total_regular_payments']:,.2f} {currency}**\n")
     
     if plan.get('total_one_time_payments', 0) > 0:
-        output += f"- 🎁 Total Bonus/Extra Payments: **{plan['total_one_time_payments']:,.0f} {currency}**\n"
+        parts.append(f"- 🎁 Total Bonus/Extra Payments: **{plan['total_one_time_payments']:,.0f} {currency}**\n")
     
     # Validation warnings
     if plan.get('validation_errors') and len(plan['validation_errors']) > 0:
-        output += "\n### ⚠️ Warnings\n\n"
+        parts.append("\n### ⚠️ Warnings\n\n")
         for error in plan['validation_errors']:
-            output += f"- {error}\n"
+            parts.append(f"- {error}\n")
     
     # Metadata footer
-    output += f"\n---\n"
-    output += f"*Calculated by: {plan.get('payoff_strategy', 'standard').title()} Strategy*  \n"
-    output += f"*Plan created: {plan.get('created_date', 'N/A')}*\n"
+    parts.append(_FOOTER_RULE)
+    parts.append(f"*Calculated by: {plan.get('payoff_strategy', 'standard').title()} Strategy*  \n")
+    parts.append(f"*Plan created: {plan.get('created_date', 'N/A')}*\n")
     
-    return output
+    return "".join(parts)
 
 
 def format_debt_plan_summary(plan_json: dict) -> str:
@@ -109,34 +156,34 @@ def format_debt_plan_summary(plan_json: dict) -> str:
     Perfect for the main_assistant to use in conversational responses.
     
     Args:
-        plan_json: The plan dictionary
+        plan_json: The plan dictionary, a FinanceDebtPlan, or its JSON text
         
     Returns:
         Short summary text
     """
-    plan = plan_json if isinstance(plan_json, dict) else json.loads(plan_json)
+    plan = _coerce_plan(plan_json)
     
     months_actual = plan.get('months_to_payoff', plan['months'])
     debt_cleared = plan['is_debt_cleared']
     
-    summary = f"Your {plan['months']}-month debt payoff plan is ready! "
+    parts = [f"Your {plan['months']}-month debt payoff plan is ready! "]
     
     if debt_cleared:
-        summary += f"Great news: you'll clear the {plan['initial_debt']:,.0f} EGP debt in just **{months_actual} months** "
+        parts.append(f"Great news: you'll clear the {plan['initial_debt']:,.0f} EGP debt in just **{months_actual} months** ")
         if months_actual < plan['months']:
-            summary += f"(ahead of schedule!) "
-        summary += f"while saving {plan['savings_rate'] * 100:.0f}% of your salary. "
+            parts.append("(ahead of schedule!) ")
+        parts.append(f"while saving {plan['savings_rate'] * 100:.0f}% of your salary. ")
     else:
-        summary += f"With your current budget, you'll reduce the {plan['initial_debt']:,.0f} EGP debt to {plan['final_balance']:,.2f} EGP. "
+        parts.append(f"With your current budget, you'll reduce the {plan['initial_debt']:,.0f} EGP debt to {plan['final_balance']:,.2f} EGP. ")
         if plan.get('recommended_payment'):
-            summary += f"To fully clear it, consider increasing your monthly payment to {plan['recommended_payment']:,.2f} EGP. "
+            parts.append(f"To fully clear it, consider increasing your monthly payment to {plan['recommended_payment']:,.2f} EGP. ")
     
-    summary += f"\n\nYou'll pay {plan['total_interest_paid']:,.2f} EGP in total interest and save {plan['total_saved']:,.0f} EGP over the plan period."
+    parts.append(f"\n\nYou'll pay {plan['total_interest_paid']:,.2f} EGP in total interest and save {plan['total_saved']:,.0f} EGP over the plan period.")
     
     if plan.get('total_one_time_payments', 0) > 0:
-        summary += f" Your bonus/extra payments of {plan['total_one_time_payments']:,.0f} EGP will significantly accelerate payoff!"
+        parts.append(f" Your bonus/extra payments of {plan['total_one_time_payments']:,.0f} EGP will significantly accelerate payoff!")
     
-    return summary
+    return "".join(parts)
 
 
 # Example usage for testing
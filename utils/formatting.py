@@ -5,7 +5,9 @@ Provides helpers for formatting tool calls, transaction summaries,
 and other user-facing content.
 """
 
+from collections import defaultdict, deque
 from datetime import datetime
+from itertools import chain
 from typing import Any
 
 
@@ -22,55 +24,35 @@ def extract_tool_info(tool_calls: list, schema_name: str = "Memory") -> str:
     Returns:
         Formatted string describing the changes
     """
-    changes = []
-    
-    for call_group in tool_calls:
-        for call in call_group:
-            if call['name'] == 'PatchDoc':
-                # Check if there are any patches
-                if call['args']['patches']:
-                    changes.append({
-                        'type': 'update',
-                        'doc_id': call['args']['json_doc_id'],
-                        'planned_edits': call['args']['planned_edits'],
-                        'value': call['args']['patches'][0]['value']
-                    })
-                else:
-                    # Handle case where no changes were needed
-                    changes.append({
-                        'type': 'no_update',
-                        'doc_id': call['args']['json_doc_id'],
-                        'planned_edits': call['args']['planned_edits']
-                    })
-            elif call['name'] == schema_name:
-                changes.append({
-                    'type': 'new',
-                    'value': call['args']
-                })
-
-    # Format results as a single string
+    # One pass over all calls, describing each change as it is found
     result_parts = []
-    for change in changes:
-        if change['type'] == 'update':
-            result_parts.append(
-                f"Document {change['doc_id']} updated:\n"
-                f"Plan: {change['planned_edits']}\n"
-                f"Added content: {change['value']}"
-            )
-        elif change['type'] == 'no_update':
-            result_parts.append(
-                f"Document {change['doc_id']} unchanged:\n"
-                f"{change['planned_edits']}"
-            )
-        else:
+    for call in chain.from_iterable(tool_calls):
+        name = call['name']
+        if name == 'PatchDoc':
+            result_parts.append(_describe_patch(call['args']))
+        elif name == schema_name:
             result_parts.append(
                 f"New {schema_name} created:\n"
-                f"Content: {change['value']}"
+                f"Content: {call['args']}"
             )
     
     return "\n\n".join(result_parts) if result_parts else "No changes made"
 
 
+def _describe_patch(args: dict) -> str:
+    """Describe a Trustcall PatchDoc call (an update, or no change needed)."""
+    if args['patches']:
+        return (
+            f"Document {args['json_doc_id']} updated:\n"
+            f"Plan: {args['planned_edits']}\n"
+            f"Added content: {args['patches'][0]['value']}"
+        )
+    return (
+        f"Document {args['json_doc_id']} unchanged:\n"
+        f"{args['planned_edits']}"
+    )
+
+
 def format_transaction_summary(transactions: list[dict]) -> str:
     """
     Format a list of transactions into a readable summary.
@@ -84,8 +66,15 @@ def format_transaction_summary(transactions: list[dict]) -> str:
     if not transactions:
         return "No transactions found."
     
-    total_income = sum(t.get('amount', 0) for t in transactions if t.get('transaction_type') == 'income')
-    total_expenses = sum(t.get('amount', 0) for t in transactions if t.get('transaction_type') == 'expense')
+    # Single pass over the transactions for both totals
+    total_income = 0
+    total_expenses = 0
+    for t in transactions:
+        trans_type = t.get('transaction_type')
+        if trans_type == 'income':
+            total_income += t.get('amount', 0)
+        elif trans_type == 'expense':
+            total_expenses += t.get('amount', 0)
     
     summary_parts = [
         f"Total Transactions: {len(transactions)}",
@@ -125,16 +114,19 @@ def format_budget_status(budgets: list[dict], transactions: list[dict]) -> str:
     
     status_parts = ["Budget Status:\n"]
     
+    # Expense totals per category, accumulated in one pass over the
+    # transactions instead of one pass per budget
+    spent_by_category = defaultdict(int)
+    for t in transactions:
+        if t.get('transaction_type') == 'expense':
+            spent_by_category[t.get('category')] += t.get('amount', 0)
+    
     for budget in budgets:
         category = budget.get('category', 'unknown')
         limit = budget.get('limit_amount', 0)
         
-        # Calculate spending for this category
-        spent = sum(
-            t.get('amount', 0) 
-            for t in transactions 
-            if t.get('category') == category and t.get('transaction_type') == 'expense'
-        )
+        # Spending for this category
+        spent = spent_by_category.get(category, 0)
         
         percentage = (spent / limit * 100) if limit > 0 else 0
         remaining = limit - spent
@@ -158,12 +150,16 @@ class Spy:
         self.called_tools = []
 
     def __call__(self, run):
-        q = [run]
+        # Depth-first walk of the run tree (LIFO keeps the original order)
+        q = deque((run,))
+        pop, extend = q.pop, q.extend
+        record = self.called_tools.append
         while q:
-            r = q.pop()
-            if r.child_runs:
-                q.extend(r.child_runs)
+            r = pop()
+            child_runs = r.child_runs
+            if child_runs:
+                extend(child_runs)
             if r.run_type == "chat_model":
-                self.called_tools.append(
+                record(
                     r.outputs["generations"][0][0]["message"]["kwargs"]["tool_calls"]
                 )
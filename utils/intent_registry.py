@@ -34,6 +34,14 @@ INTENT_REGISTRY = {
 }
 
 
+# (assistant_type, intent) -> executor, flattened once for single-probe lookups
+_FLAT_INTENT_REGISTRY = {
+    (assistant_type, intent): executor
+    for assistant_type, intents in INTENT_REGISTRY.items()
+    for intent, executor in intents.items()
+}
+
+
 def get_executor_for_intent(assistant_type: str, intent: str) -> Optional[str]:
     """
     Get the executor node name for a specific intent.
@@ -49,7 +57,7 @@ def get_executor_for_intent(assistant_type: str, intent: str) -> Optional[str]:
         >>> executor = get_executor_for_intent('finance', 'add_transaction')
         >>> # Returns 'finance_add_transaction_executor'
     """
-    return INTENT_REGISTRY.get(assistant_type, {}).get(intent)
+    return _FLAT_INTENT_REGISTRY.get((assistant_type, intent))
 
 
 def get_all_intents_for_assistant(assistant_type: str) -> list[str]:
@@ -0,0 +1,54 @@
+"""
+JSON helpers used on hot paths.
+
+Uses orjson when it is installed (much faster encode/decode) and falls
+back to the standard library otherwise, so orjson stays optional.
+"""
+
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any, *, sort_keys: bool = False, default: Callable[[Any], Any] | None = None) -> str:
+    """
+    Serialize an object to a JSON string.
+    
+    Args:
+        obj: JSON-compatible object
+        sort_keys: Emit object keys in sorted order (stable output)
+        default: Fallback serializer for unsupported types
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS if sort_keys else None
+        return orjson.dumps(obj, default=default, option=option).decode()
+    # Match orjson's output: UTF-8 text, no whitespace between tokens
+    return json.dumps(
+        obj, sort_keys=sort_keys, default=default,
+        ensure_ascii=False, separators=(",", ":")
+    )
+
+
+def loads(data: str | bytes) -> Any:
+    """
+    Parse a JSON string.
+    
+    Args:
+        data: JSON text
+        
+    Returns:
+        Parsed object
+        
+    Raises:
+        ValueError: If the text is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
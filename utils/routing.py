@@ -0,0 +1,49 @@
+"""
+Routing helpers shared by the router and memory update nodes.
+
+Both need the RouteIntent tool call that main_assistant issued for the
+current turn.
+"""
+
+from typing import Optional
+
+
+ROUTE_INTENT_TOOL = "RouteIntent"
+
+# RouteIntent is at most this far from the end of the conversation
+# when the router or memory_update looks for it
+ROUTE_INTENT_DEPTH = 3
+
+
+def find_last_route_intent(messages: list, depth: Optional[int] = ROUTE_INTENT_DEPTH) -> Optional[dict]:
+    """
+    Find the most recent RouteIntent tool call in a conversation.
+
+    Only the last `depth` messages are inspected: main_assistant's routing
+    message is the latest message when the router runs and sits right
+    behind the executor's tool message when memory_update runs. Anything
+    older belongs to a previous turn.
+
+    Args:
+        messages: Conversation messages, oldest first
+        depth: Number of trailing messages to inspect (None for all)
+
+    Returns:
+        The RouteIntent tool call dict, or None if there is none
+    """
+    recent = messages if depth is None else messages[-depth:]
+    for msg in reversed(recent):
+        tool_calls = getattr(msg, "tool_calls", None)
+        if not tool_calls:
+            continue
+
+        # RouteIntent is almost always the first (and only) call
+        first = tool_calls[0]
+        if first.get("name") == ROUTE_INTENT_TOOL:
+            return first
+
+        for tc in tool_calls[1:]:
+            if tc.get("name") == ROUTE_INTENT_TOOL:
+                return tc
+
+    return None
@@ -5,83 +5,135 @@ Groq doesn't support $defs references in JSON schemas,
 so we need to flatten Pydantic schemas before using them.
 """
 
+import copy
+from functools import lru_cache
 from typing import Type, Any, Dict
 from pydantic import BaseModel
 
+from . import json_utils
+
 
 def flatten_schema_for_groq(schema_class: Type[BaseModel]) -> Dict[str, Any]:
     """
     Flatten a Pydantic schema by removing $defs and inlining all references.
     
+    The flattening runs once per schema class; callers get their own copy
+    of the cached result so they can modify it freely.
+    
     Args:
         schema_class: Pydantic BaseModel class
         
     Returns:
         Flattened schema dictionary compatible with Groq
     """
+    return copy.deepcopy(_flatten_schema(schema_class))
+
+
+@lru_cache(maxsize=None)
+def _flatten_schema(schema_class: Type[BaseModel]) -> Dict[str, Any]:
+    """Build the flattened schema for a class (shared, do not mutate)."""
     # Get the raw schema
     raw_schema = schema_class.model_json_schema()
     
     # Extract $defs if they exist
     defs = raw_schema.pop("$defs", {})
     
-    # Recursively resolve all $ref references
-    def resolve_refs(obj: Any) -> Any:
-        if isinstance(obj, dict):
-            if "$ref" in obj:
-                # Extract reference name
-                ref_path = obj["$ref"].split("/")[-1]
-                if ref_path in defs:
-                    # Return resolved definition
-                    return resolve_refs(defs[ref_path].copy())
-                else:
-                    # Fallback to generic type
-                    return {"type": "string"}
-            else:
-                # Recursively resolve all nested dicts
-                return {k: resolve_refs(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [resolve_refs(item) for item in obj]
-        else:
-            return obj
-    
-    # Resolve all references in the schema
-    flattened = resolve_refs(raw_schema)
+    # Resolve all references in the schema (in place; the raw schema is ours).
+    # Pydantic only emits $ref alongside $defs, so flat models skip the walk.
+    flattened = _resolve_refs(raw_schema, defs) if defs else raw_schema
     
     # Clean up additional Pydantic-specific fields that Groq doesn't like
-    if "title" in flattened:
-        del flattened["title"]
+    flattened.pop("title", None)
     
     # Ensure we have the basic structure Groq expects
-    if "properties" not in flattened:
-        flattened["properties"] = {}
-    
-    if "type" not in flattened:
-        flattened["type"] = "object"
-    
-    # Simplify datetime fields to strings
-    if "properties" in flattened:
-        for prop_name, prop_def in flattened["properties"].items():
-            if isinstance(prop_def, dict):
-                # Convert datetime to string type
-                if prop_def.get("format") == "date-time":
-                    prop_def["type"] = "string"
-                    prop_def["description"] = prop_def.get("description", "") + " (format: YYYY-MM-DD or ISO 8601)"
-                    if "format" in prop_def:
-                        del prop_def["format"]
-                
-                # Simplify anyOf/allOf to just the first type
-                if "anyOf" in prop_def:
-                    # Take the first non-null type
-                    for option in prop_def["anyOf"]:
-                        if isinstance(option, dict) and option.get("type") != "null":
-                            prop_def.update(option)
-                            break
-                    del prop_def["anyOf"]
+    properties = flattened.setdefault("properties", {})
+    flattened.setdefault("type", "object")
+    
+    # Simplify datetime fields to strings and optional fields to one type
+    for prop_def in properties.values():
+        if not isinstance(prop_def, dict):
+            continue
+        
+        # Convert datetime to string type
+        if prop_def.get("format") == "date-time":
+            del prop_def["format"]
+            prop_def["type"] = "string"
+            prop_def["description"] = prop_def.get("description", "") + " (format: YYYY-MM-DD or ISO 8601)"
+        
+        # Simplify anyOf to the first non-null type
+        any_of = prop_def.get("anyOf")
+        if any_of is not None:
+            for option in any_of:
+                if isinstance(option, dict) and option.get("type") != "null":
+                    prop_def.update(option)
+                    break
+            del prop_def["anyOf"]
     
     return flattened
 
 
+def _resolve_refs(schema: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Inline every $ref in `schema` from `defs`, using an explicit stack.
+    
+    Each reference gets its own copy of the definition. References that
+    are not "#/$defs/<Name>" entries of `defs` fall back to a generic
+    string type; a reference back into a definition that is already
+    being inlined (a recursive model) stops the expansion as a generic
+    object.
+    """
+    # Pydantic always emits refs as "#/$defs/<Name>"
+    ref_names = {f"#/$defs/{name}": name for name in defs}
+    return _resolve_refs_in(schema, defs, ref_names, frozenset(), {})[0]
+
+
+def _resolve_refs_in(
+    schema: Any,
+    defs: Dict[str, Any],
+    ref_names: Dict[str, str],
+    seen: frozenset,
+    resolved: Dict[str, Any]
+) -> tuple[Any, bool]:
+    """
+    Resolve `schema` in place while the definitions in `seen` are being inlined.
+    
+    Each definition is walked once; later references copy the resolved
+    form from `resolved`. A definition whose expansion hit a recursive
+    reference depends on where it is inlined, so it is not memoized.
+    
+    Returns:
+        (resolved schema, whether a recursive reference was cut short)
+    """
+    truncated = False
+    root = {"": schema}
+    stack = [root]
+    while stack:
+        container = stack.pop()
+        for key, value in (container.items() if isinstance(container, dict) else enumerate(container)):
+            if isinstance(value, dict) and "$ref" in value:
+                ref_name = ref_names.get(value["$ref"])
+                if ref_name is None:
+                    container[key] = {"type": "string"}
+                elif ref_name in resolved:
+                    container[key] = copy.deepcopy(resolved[ref_name])
+                elif ref_name in seen:
+                    container[key] = {"type": "object"}
+                    truncated = True
+                else:
+                    value, def_truncated = _resolve_refs_in(
+                        copy.deepcopy(defs[ref_name]), defs, ref_names, seen | {ref_name}, resolved
+                    )
+                    if def_truncated:
+                        truncated = True
+                    else:
+                        resolved[ref_name] = copy.deepcopy(value)
+                    container[key] = value
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+    
+    return root[""], truncated
+
+
 def create_groq_compatible_tool(schema_class: Type[BaseModel]) -> Dict[str, Any]:
     """
     Create a Groq-compatible tool definition from a Pydantic schema.
@@ -92,7 +144,13 @@ def create_groq_compatible_tool(schema_class: Type[BaseModel]) -> Dict[str, Any]
     Returns:
         Tool definition dictionary for Groq API
     """
-    flattened_schema = flatten_schema_for_groq(schema_class)
+    return copy.deepcopy(_groq_tool(schema_class))
+
+
+@lru_cache(maxsize=None)
+def _groq_tool(schema_class: Type[BaseModel]) -> Dict[str, Any]:
+    """Build the tool definition for a class (shared, do not mutate)."""
+    flattened_schema = _flatten_schema(schema_class)
     
     return {
         "type": "function",
@@ -101,4 +159,21 @@ def create_groq_compatible_tool(schema_class: Type[BaseModel]) -> Dict[str, Any]
             "description": schema_class.__doc__.strip() if schema_class.__doc__ else schema_class.__name__,
             "parameters": flattened_schema
         }
-    }
\ No newline at end of file
+    }
+
+
+def serialize_tool(tool: Dict[str, Any]) -> str:
+    """
+    Serialize a tool definition to JSON with a stable key order.
+    
+    Uses orjson when installed (see utils.json_utils). Sorted keys make the
+    payload byte-identical for the same tool, which keeps it usable as a
+    cache key.
+    
+    Args:
+        tool: Tool definition from create_groq_compatible_tool
+        
+    Returns:
+        JSON string
+    """
+    return json_utils.dumps(tool, sort_keys=True)
@@ -5,9 +5,11 @@ This module provides dynamic schema lookup based on assistant type
 and memory type, enabling the framework to support multiple domains.
 """
 
+from functools import lru_cache
 from typing import Type, Optional
 from pydantic import BaseModel
 
+from .schema_flattener import create_groq_compatible_tool
 from schemas import (
     Profile,
     FinanceTransaction,
@@ -38,6 +40,14 @@ SCHEMA_REGISTRY = {
 }
 
 
+# (assistant_type, memory_type) -> schema, flattened once for single-probe lookups
+_FLAT_SCHEMA_REGISTRY = {
+    (assistant_type, memory_type): schema
+    for assistant_type, schemas in SCHEMA_REGISTRY.items()
+    for memory_type, schema in schemas.items()
+}
+
+
 def get_schema_for_memory_type(
     assistant_type: str,
     memory_type: str
@@ -56,7 +66,7 @@ def get_schema_for_memory_type(
         >>> schema = get_schema_for_memory_type('finance', 'finance_transactions')
         >>> # Returns FinanceTransaction class
     """
-    return SCHEMA_REGISTRY.get(assistant_type, {}).get(memory_type)
+    return _FLAT_SCHEMA_REGISTRY.get((assistant_type, memory_type))
 
 
 def get_all_schemas_for_assistant(assistant_type: str) -> dict[str, Type[BaseModel]]:
@@ -86,4 +96,52 @@ def get_schema_name(schema_class: Type[BaseModel]) -> str:
     Returns:
         Schema name as string
     """
-    return schema_class.__name__
\ No newline at end of file
+    return schema_class.__name__
+
+
+@lru_cache(maxsize=None)
+def get_schema_bundle(
+    assistant_type: str,
+    memory_type: str
+) -> Optional[tuple[Type[BaseModel], str]]:
+    """
+    Get the schema and its tool name for a memory type, resolved once.
+    
+    Args:
+        assistant_type: Type of assistant
+        memory_type: Type of memory
+        
+    Returns:
+        (schema_class, schema_name) or None if not found
+    """
+    schema = get_schema_for_memory_type(assistant_type, memory_type)
+    if schema is None:
+        return None
+    return schema, get_schema_name(schema)
+
+
+# ============================================================================
+# Groq Tool Definitions (flattened on first use, then cached)
+# ============================================================================
+
+def get_groq_tool_for_memory_type(
+    assistant_type: str,
+    memory_type: str
+) -> Optional[dict]:
+    """
+    Get the Groq tool definition for a memory type.
+    
+    The definition is built once per schema by the flattener; each call
+    returns a private copy that is safe to modify.
+    
+    Args:
+        assistant_type: Type of assistant
+        memory_type: Type of memory
+        
+    Returns:
+        Groq tool definition dictionary or None if not found
+    """
+    schema = get_schema_for_memory_type(assistant_type, memory_type)
+    if schema is None:
+        return None
+    return create_groq_compatible_tool(schema)
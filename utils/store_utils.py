@@ -5,8 +5,18 @@ Provides helpers for loading, saving, and formatting memories
 from the LangGraph store.
 """
 
+import weakref
 from typing import Optional, Any
-from langgraph.store.base import BaseStore
+from langgraph.store.base import BaseStore, SearchOp
+
+from . import json_utils
+
+
+# Per-turn read cache for aget_all_memories_by_type:
+# store -> {namespace: (turn_id, items)}. Weakly keyed, so a store's
+# entries go away with the store and are never served to another one.
+_MEMORY_CACHE = weakref.WeakKeyDictionary()
+_MEMORY_CACHE_MAX = 1024  # namespaces per store
 
 
 def get_memory(
@@ -24,7 +34,8 @@ def get_memory(
         memory_type: Type of memory (e.g., 'profile', 'finance_transactions')
         assistant_type: Assistant type (e.g., 'finance', 'todo')
         user_id: User identifier
-        key: Optional specific key to retrieve. If None, searches all.
+        key: Optional specific key to retrieve. If None, returns the first
+            memory in the namespace.
         
     Returns:
         Memory value or None if not found
@@ -36,11 +47,9 @@ def get_memory(
         memory = store.get(namespace, key)
         return memory.value if memory else None
     else:
-        # Search for all memories in namespace
-        memories = store.search(namespace)
-        if memories:
-            return memories[0].value
-        return None
+        # Only the first memory is returned, so fetch just that one
+        memories = store.search(namespace, limit=1)
+        return memories[0].value if memories else None
 
 
 def save_memory(
@@ -64,12 +73,83 @@ def save_memory(
     """
     namespace = (memory_type, assistant_type, user_id)
     store.put(namespace, key, value)
+    invalidate_memory_cache(store, namespace)
+
+
+async def aget_memory(
+    store: BaseStore,
+    memory_type: str,
+    assistant_type: str,
+    user_id: str,
+    key: Optional[str] = None
+) -> Optional[Any]:
+    """
+    Async version of get_memory, using the store's native async API.
+    
+    Args:
+        store: LangGraph BaseStore instance
+        memory_type: Type of memory (e.g., 'profile', 'finance_transactions')
+        assistant_type: Assistant type (e.g., 'finance', 'todo')
+        user_id: User identifier
+        key: Optional specific key to retrieve. If None, returns the first
+            memory in the namespace.
+        
+    Returns:
+        Memory value or None if not found
+    """
+    namespace = (memory_type, assistant_type, user_id)
+    
+    if key:
+        memory = await store.aget(namespace, key)
+        return memory.value if memory else None
+    
+    memories = await store.asearch(namespace, limit=1)
+    return memories[0].value if memories else None
+
+
+async def asave_memory(
+    store: BaseStore,
+    memory_type: str,
+    assistant_type: str,
+    user_id: str,
+    key: str,
+    value: dict
+) -> None:
+    """
+    Async version of save_memory, using the store's native async API.
+    
+    Args:
+        store: LangGraph BaseStore instance
+        memory_type: Type of memory
+        assistant_type: Assistant type
+        user_id: User identifier
+        key: Memory key
+        value: Memory value (dictionary)
+    """
+    namespace = (memory_type, assistant_type, user_id)
+    await store.aput(namespace, key, value)
+    invalidate_memory_cache(store, namespace)
+
+
+def invalidate_memory_cache(store: BaseStore, namespace: tuple) -> None:
+    """
+    Drop cached reads for a namespace.
+    
+    Must be called after every write to the store so the next
+    aget_all_memories_by_type call sees the new data.
+    """
+    store_cache = _MEMORY_CACHE.get(store)
+    if store_cache is not None:
+        store_cache.pop(tuple(namespace), None)
 
 
 def format_memories(memories: list, separator: str = "\n\n") -> str:
     """
     Format a list of memories into a readable string.
     
+    Each memory value is rendered as compact JSON, which is cheaper to
+    produce than a dict repr and shorter in the prompt.
+    
     Args:
         memories: List of memory items from store
         separator: String to separate individual memories
@@ -80,7 +160,7 @@ def format_memories(memories: list, separator: str = "\n\n") -> str:
     if not memories:
         return ""
     
-    return separator.join(str(mem.value) for mem in memories)
+    return separator.join(json_utils.dumps(mem.value, default=str) for mem in memories)
 
 
 def get_all_memories_by_type(
@@ -103,3 +183,112 @@ def get_all_memories_by_type(
     """
     namespace = (memory_type, assistant_type, user_id)
     return store.search(namespace)
+
+
+def search_namespace(store: BaseStore, namespace: tuple, page_size: int = 100) -> list:
+    """
+    Get every item in a namespace, paging past the store's search limit.
+    
+    Args:
+        store: LangGraph BaseStore instance
+        namespace: Namespace to read
+        page_size: Items fetched per store call
+        
+    Returns:
+        List of memory items (in the store's own order)
+    """
+    items = []
+    while True:
+        page = store.search(namespace, limit=page_size, offset=len(items))
+        items.extend(page)
+        if len(page) < page_size:
+            return items
+
+
+async def aget_all_memories_by_type(
+    store: BaseStore,
+    memory_type: str,
+    assistant_type: str,
+    user_id: str,
+    turn_id: Optional[str] = None
+) -> list:
+    """
+    Async version of get_all_memories_by_type.
+    
+    Uses the store's native async API so several reads can be
+    awaited concurrently without a worker thread per call.
+    
+    When turn_id is given, results are cached for that turn so repeated
+    passes over the same user message skip the store. Writers invalidate
+    the cache via invalidate_memory_cache.
+    
+    Args:
+        store: LangGraph BaseStore instance
+        memory_type: Type of memory to retrieve
+        assistant_type: Assistant type
+        user_id: User identifier
+        turn_id: Optional id of the current user turn
+        
+    Returns:
+        List of memory items
+    """
+    memories, = await aget_memories_by_types(
+        store, [memory_type], assistant_type, user_id, turn_id
+    )
+    return memories
+
+
+async def aget_memories_by_types(
+    store: BaseStore,
+    memory_types: list[str],
+    assistant_type: str,
+    user_id: str,
+    turn_id: Optional[str] = None
+) -> list[list]:
+    """
+    Get all memories for several memory types in one store round-trip.
+    
+    Namespaces not served by the per-turn cache are fetched with a single
+    store.abatch call, which backends can answer with one query instead
+    of one search per type.
+    
+    Args:
+        store: LangGraph BaseStore instance
+        memory_types: Types of memory to retrieve
+        assistant_type: Assistant type
+        user_id: User identifier
+        turn_id: Optional id of the current user turn (see
+            aget_all_memories_by_type)
+        
+    Returns:
+        One list of memory items per memory type, in the same order
+    """
+    namespaces = [(memory_type, assistant_type, user_id) for memory_type in memory_types]
+    results = [None] * len(namespaces)
+    
+    store_cache = _MEMORY_CACHE.setdefault(store, {}) if turn_id is not None else {}
+    
+    missing = []
+    for i, namespace in enumerate(namespaces):
+        cached = store_cache.get(namespace)
+        if cached is not None and cached[0] == turn_id:
+            results[i] = cached[1]
+        else:
+            missing.append(i)
+    
+    if missing:
+        # Same TTL refresh behaviour as store.asearch
+        ttl_config = getattr(store, "ttl_config", None)
+        refresh_ttl = ttl_config.get("refresh_on_read", True) if ttl_config else True
+        fetched = await store.abatch([
+            SearchOp(namespaces[i], refresh_ttl=refresh_ttl) for i in missing
+        ])
+        
+        if len(store_cache) + len(missing) > _MEMORY_CACHE_MAX:
+            store_cache.clear()
+        for i, memories in zip(missing, fetched):
+            results[i] = memories
+            if turn_id is not None:
+                store_cache[namespaces[i]] = (turn_id, memories)
+    
+    return results